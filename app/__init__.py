@@ -6,6 +6,9 @@ from celery import Celery, Task
 from config import config_by_name
 from .extensions import db, ma, migrate, jwt, cors, socketio
 from .api import api_v2_bp # Importa o blueprint principal da API
+from .cli import model_cli
+from .realtime import register_socket_handlers
+from .metrics import metrics_view, register_publish_hook
 
 # Define o nome do nosso pacote de tarefas para o Celery
 CELERY_TASK_LIST = [
@@ -25,8 +28,22 @@ def create_celery(app):
     celery_app.config_from_object(app.config["CELERY"])
     celery_app.autodiscover_tasks(CELERY_TASK_LIST)
     celery_app.set_default()
+    app.extensions['celery'] = celery_app
+
+    # Pré-carrega o modelo nos processos do worker (import tardio: a API não precisa disso)
+    from .tasks.worker_hooks import register_worker_hooks
+    register_worker_hooks(app)
     return celery_app
 
+def create_celery_client(app):
+    """
+    Celery usado pela API apenas para enfileirar tarefas pelo nome (send_task):
+    sem autodiscover, o processo da API não importa app.tasks nem o modelo.
+    """
+    celery_client = Celery(app.import_name)
+    celery_client.config_from_object(app.config["CELERY"])
+    return celery_client
+
 def create_app(config_name='development'):
     """
     Application Factory: Cria e configura a instância da aplicação Flask.
@@ -43,7 +60,19 @@ def create_app(config_name='development'):
     # --- ALTERAÇÃO AQUI ---
     # Adicione a configuração da message_queue para o Socket.IO
     socketio.init_app(app, cors_allowed_origins="*", message_queue=app.config["CELERY"]["broker_url"])
+    # Conexões autenticadas com o JWT entram na sala do usuário (eventos de progresso)
+    register_socket_handlers(socketio)
 
     app.register_blueprint(api_v2_bp)
 
+    # Enfileiramento das tarefas (substituído pelo Celery completo em create_celery no worker)
+    app.extensions['celery'] = create_celery_client(app)
+
+    # Métricas Prometheus (etapas, serviços e tarefas) e horário de envio das tarefas
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    register_publish_hook()
+
+    # Comandos de manutenção do modelo (flask model convert/compare)
+    app.cli.add_command(model_cli)
+
     return app
\ No newline at end of file
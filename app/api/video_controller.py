@@ -3,17 +3,42 @@
 import uuid
 import os
 import traceback
-from flask import request, jsonify, Blueprint, current_app, send_from_directory, url_for
+from flask import request, jsonify, Blueprint, current_app, redirect, send_from_directory, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
 from marshmallow import ValidationError
 
 from app import services
+from app.models import VideoStatus
 from app.schemas import VideoSchema, VideoDetailSchema, VideoUpdateSchema
-from app.tasks import process_video
+from app.task_interface import enqueue_process_video
 
 video_bp = Blueprint('video_api', __name__, url_prefix='/videos')
 
+def parse_target_fps(raw_value):
+    """
+    Valida a taxa de amostragem opcional enviada pelo cliente.
+    Retorna None quando não informada (usa o TARGET_FPS da configuração).
+    """
+    if raw_value in (None, ''):
+        return None
+    try:
+        target_fps = float(raw_value)
+    except (TypeError, ValueError):
+        raise ValueError("target_fps deve ser um número.")
+
+    max_target_fps = current_app.config.get('MAX_TARGET_FPS', 60)
+    if target_fps <= 0 or target_fps > max_target_fps:
+        raise ValueError(f"target_fps deve estar entre 0 e {max_target_fps:g}.")
+    return target_fps
+
+def parse_profile_flag(raw_value, user_id):
+    """Perfil sob demanda do processamento: só é aceito quando pedido por um administrador."""
+    if str(raw_value).lower() not in ('true', '1', 'yes'):
+        return False
+    user = services.get_user_by_id(user_id)
+    return bool(user and user.is_admin)
+
 @video_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_user_videos():
@@ -31,18 +56,81 @@ def get_video_details(video_id):
     if not video or video.user_id != user_id:
         return jsonify({"error": "Vídeo não encontrado ou acesso não permitido."}), 404
 
-    video_dump = VideoDetailSchema().dump(video)
-    
+    since_frame = request.args.get('since_frame')
+    if since_frame is not None:
+        try:
+            since_frame = int(since_frame)
+        except ValueError:
+            return jsonify({"error": "since_frame deve ser um número inteiro."}), 400
+
+    # Durante o processamento os frames são gravados em blocos: o cliente lê o que já
+    # existe e depois pede só o restante com ?since_frame=<frames_high_water_mark>
+    frames = services.get_video_frames(video.id, since_frame)
+    video_dump = VideoDetailSchema(frames, since_frame).dump(video)
+
     # --- LÓGICA DE DECISÃO CORRIGIDA ---
     storage_type = current_app.config.get('STORAGE_TYPE', 's3')
     if storage_type == 's3':
-        video_dump['video_url'] = services.s3_generate_presigned_get_url(video.s3_key)
+        video_dump['video_url'] = services.get_cached_presigned_get_url(video.s3_key)
     else:
         filename = os.path.basename(video.s3_key)
         video_dump['video_url'] = url_for('api_v2.video_api.stream_video', filename=filename, _external=True)
 
     return jsonify(video_dump), 200
 
+@video_bp.route('/<string:video_id>/status', methods=['GET'])
+@jwt_required()
+def get_video_status(video_id):
+    """
+    Status leve para polling: lido do hash no Redis atualizado pela tarefa, sem
+    consultar o MySQL. Se o hash tiver expirado, usa a coluna 'status' do vídeo.
+    """
+    user_id = get_jwt_identity()
+    cached = services.get_cached_video_status(video_id)
+    if cached:
+        if cached['user_id'] != user_id:
+            return jsonify({"error": "Vídeo não encontrado ou acesso não permitido."}), 404
+        return jsonify({
+            "video_id": video_id,
+            "status": cached['status'],
+            "progress": cached['progress'],
+            "stage": cached['stage'],
+            "eta_seconds": cached['eta_seconds'],
+        }), 200
+
+    video = services.get_video_by_id(video_id)
+    if not video or video.user_id != user_id:
+        return jsonify({"error": "Vídeo não encontrado ou acesso não permitido."}), 404
+    return jsonify({
+        "video_id": video_id,
+        "status": video.status.value,
+        "progress": 100 if video.status == VideoStatus.COMPLETED else 0,
+        "stage": None,
+        "eta_seconds": None,
+    }), 200
+
+@video_bp.route('/<string:video_id>/profile', methods=['GET'])
+@jwt_required()
+def get_video_profile(video_id):
+    """Baixa o perfil (.zip com cProfile e trace do TensorFlow) do processamento. Apenas administradores."""
+    user = services.get_user_by_id(get_jwt_identity())
+    if not user or not user.is_admin:
+        return jsonify({"error": "Acesso permitido apenas a administradores."}), 403
+
+    video = services.get_video_by_id(video_id)
+    if not video or not video.profile_key:
+        return jsonify({"error": "Nenhum perfil disponível para este vídeo."}), 404
+
+    storage_type = current_app.config.get('STORAGE_TYPE', 's3')
+    if storage_type == 's3':
+        profile_url = services.s3_generate_presigned_get_url(video.profile_key)
+        if not profile_url:
+            return jsonify({"error": "Não foi possível gerar a URL do perfil."}), 500
+        return redirect(profile_url)
+
+    profiles_folder = os.path.join(current_app.config['LOCAL_STORAGE_PATH'], 'profiles')
+    return send_from_directory(profiles_folder, os.path.basename(video.profile_key), as_attachment=True)
+
 @video_bp.route('/upload', methods=['POST'])
 @jwt_required()
 def upload_video():
@@ -77,6 +165,20 @@ def update_video(video_id):
         traceback.print_exc()
         return jsonify({"error": "Ocorreu um erro inesperado."}), 500
 
+def build_upload_key(user_id, filename):
+    file_ext = filename.split('.')[-1] if '.' in filename else ''
+    return f"uploads/{user_id}/{uuid.uuid4()}.{file_ext}"
+
+def owns_upload_key(s3_key, user_id):
+    """Uploads multipart só podem ser concluídos ou cancelados pelo dono da chave."""
+    return bool(s3_key) and s3_key.startswith(f"uploads/{user_id}/")
+
+def valid_multipart_parts(parts):
+    return bool(parts) and isinstance(parts, list) and all(
+        isinstance(part, dict) and part.get('etag') and str(part.get('part_number', '')).isdigit()
+        for part in parts
+    )
+
 def initialize_s3_upload():
     user_id = get_jwt_identity()
     json_data = request.get_json()
@@ -85,8 +187,7 @@ def initialize_s3_upload():
     if not filename:
         return jsonify({"error": "O nome do arquivo é obrigatório."}), 400
 
-    file_ext = filename.split('.')[-1] if '.' in filename else ''
-    s3_key = f"uploads/{user_id}/{uuid.uuid4()}.{file_ext}"
+    s3_key = build_upload_key(user_id, filename)
     upload_url = services.generate_presigned_upload_url(s3_key)
 
     if not upload_url:
@@ -94,6 +195,61 @@ def initialize_s3_upload():
     
     return jsonify({"upload_url": upload_url, "s3_key": s3_key}), 200
 
+@video_bp.route('/upload/multipart', methods=['POST'])
+@jwt_required()
+def initialize_multipart_upload():
+    """
+    Inicia um upload multipart (vídeos grandes): retorna uma URL pré-assinada por
+    parte. O cliente envia as partes (em paralelo, com novas tentativas por parte)
+    e conclui com /upload/finalize informando upload_id e os ETags das partes.
+    """
+    storage_type = current_app.config.get('STORAGE_TYPE', 's3')
+    if storage_type == 'local':
+        return jsonify({"message": "Endpoint não aplicável para o modo de armazenamento local."}), 400
+
+    user_id = get_jwt_identity()
+    json_data = request.get_json() or {}
+    filename = json_data.get('filename')
+    if not filename:
+        return jsonify({"error": "O nome do arquivo é obrigatório."}), 400
+    try:
+        file_size = int(json_data.get('size'))
+    except (TypeError, ValueError):
+        return jsonify({"error": "size (tamanho do arquivo em bytes) é obrigatório."}), 400
+    if file_size <= 0:
+        return jsonify({"error": "size deve ser maior que zero."}), 400
+    max_upload_size = current_app.config.get('MAX_UPLOAD_SIZE', 10 * 1024 * 1024 * 1024)
+    if file_size > max_upload_size:
+        return jsonify({"error": f"O arquivo excede o tamanho máximo de {max_upload_size} bytes."}), 400
+
+    s3_key = build_upload_key(user_id, filename)
+    upload = services.s3_create_multipart_upload(s3_key, file_size)
+    if not upload:
+        return jsonify({"error": "Não foi possível iniciar o upload."}), 500
+
+    return jsonify({"s3_key": s3_key, **upload}), 200
+
+@video_bp.route('/upload/multipart/abort', methods=['POST'])
+@jwt_required()
+def abort_multipart_upload():
+    """Cancela um upload multipart e descarta as partes já enviadas."""
+    storage_type = current_app.config.get('STORAGE_TYPE', 's3')
+    if storage_type == 'local':
+        return jsonify({"message": "Endpoint não aplicável para o modo de armazenamento local."}), 400
+
+    user_id = get_jwt_identity()
+    json_data = request.get_json() or {}
+    s3_key = json_data.get('s3_key')
+    upload_id = json_data.get('upload_id')
+    if not s3_key or not upload_id:
+        return jsonify({"error": "s3_key e upload_id são obrigatórios."}), 400
+    if not owns_upload_key(s3_key, user_id):
+        return jsonify({"error": "Upload não encontrado ou acesso não permitido."}), 404
+
+    if not services.s3_abort_multipart_upload(s3_key, upload_id):
+        return jsonify({"error": "Não foi possível cancelar o upload."}), 500
+    return jsonify({"message": "Upload cancelado."}), 200
+
 def upload_local_video():
     user_id = get_jwt_identity()
     if 'file' not in request.files:
@@ -105,6 +261,12 @@ def upload_local_video():
     if not title or file.filename == '':
         return jsonify({"error": "Título e arquivo são obrigatórios."}), 400
 
+    try:
+        target_fps = parse_target_fps(request.form.get('target_fps'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    profile = parse_profile_flag(request.form.get('profile'), user_id)
+
     filename = secure_filename(file.filename)
     file_ext = filename.split('.')[-1] if '.' in filename else ''
     
@@ -118,7 +280,8 @@ def upload_local_video():
         
         video_record_key = f"uploads/{user_id}/{local_filename}"
         video = services.create_video_record(user_id, title, video_record_key)
-        process_video.delay(video.id)
+        services.record_video_status(video.id, user_id, 'PENDING', 0, stage='queued')
+        enqueue_process_video(video.id, target_fps=target_fps, profile=profile)
         
         video_schema = VideoSchema()
         return jsonify(video_schema.dump(video)), 202
@@ -141,9 +304,27 @@ def finalize_upload():
     if not s3_key or not title:
         return jsonify({"error": "s3_key e title são obrigatórios."}), 400
 
+    try:
+        target_fps = parse_target_fps(json_data.get('target_fps'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    profile = parse_profile_flag(json_data.get('profile'), user_id)
+
+    # Upload multipart: une as partes antes de registrar o vídeo
+    upload_id = json_data.get('upload_id')
+    if upload_id:
+        if not owns_upload_key(s3_key, user_id):
+            return jsonify({"error": "Upload não encontrado ou acesso não permitido."}), 404
+        parts = json_data.get('parts')
+        if not valid_multipart_parts(parts):
+            return jsonify({"error": "parts deve ser uma lista de {part_number, etag}."}), 400
+        if not services.s3_complete_multipart_upload(s3_key, upload_id, parts):
+            return jsonify({"error": "Não foi possível concluir o upload multipart."}), 400
+
     try:
         video = services.create_video_record(user_id, title, s3_key)
-        process_video.delay(video.id)
+        services.record_video_status(video.id, user_id, 'PENDING', 0, stage='queued')
+        enqueue_process_video(video.id, target_fps=target_fps, profile=profile)
         video_schema = VideoSchema()
         return jsonify(video_schema.dump(video)), 202
     except services.VideoServiceError as e:
@@ -0,0 +1,50 @@
+# app/cli.py
+
+import json
+import click
+from flask.cli import AppGroup
+
+model_cli = AppGroup('model', help='Conversão e validação dos backends do modelo de emoções.')
+
+@model_cli.command('convert')
+@click.option('--keras-path', default=None, help='Modelo .h5 de origem (padrão: MODEL_CONFIG).')
+@click.option('--quantization', type=click.Choice(['float', 'int8']), default='float', show_default=True)
+@click.option('--calibration', 'calibration_path', default=None,
+              help='Vídeo ou .npy de frames usados para calibrar a quantização int8.')
+@click.option('--output', default=None, help='Arquivo .tflite de saída (padrão: MODEL_CONFIG).')
+def convert_model(keras_path, quantization, calibration_path, output):
+    """Converte o modelo Keras para TFLite (float ou int8)."""
+    # Imports tardios: a CLI da API não deve carregar o TensorFlow sem necessidade
+    from app.tasks.model_conversion import convert_to_tflite, load_frame_set
+    from app.task_interface import MODEL_CONFIG
+
+    backend_name = 'tflite_int8' if quantization == 'int8' else 'tflite'
+    keras_path = keras_path or MODEL_CONFIG['local_path']
+    output = output or MODEL_CONFIG[backend_name]['local_path']
+
+    calibration_frames = load_frame_set(calibration_path) if calibration_path else None
+    convert_to_tflite(keras_path, output, None if quantization == 'float' else 'int8', calibration_frames)
+    click.echo(f"Modelo convertido salvo em: {output}")
+
+@model_cli.command('compare')
+@click.argument('frames_path')
+@click.option('--backend', type=click.Choice(['tflite', 'tflite_int8']), default='tflite_int8', show_default=True)
+@click.option('--keras-path', default=None, help='Modelo .h5 de referência (padrão: MODEL_CONFIG).')
+@click.option('--tflite-path', default=None, help='Modelo .tflite a comparar (padrão: MODEL_CONFIG).')
+@click.option('--save-frames', default=None, help='Salva o conjunto de frames em .npy para repetir a comparação.')
+def compare_model(frames_path, backend, keras_path, tflite_path, save_frames):
+    """Compara a precisão e a latência do TFLite com o Keras num conjunto fixo de frames."""
+    import numpy as np
+    from app.tasks.model_conversion import compare_backends, load_frame_set
+    from app.task_interface import MODEL_CONFIG
+
+    frames = load_frame_set(frames_path)
+    if save_frames:
+        np.save(save_frames, frames)
+
+    report = compare_backends(
+        keras_path or MODEL_CONFIG['local_path'],
+        tflite_path or MODEL_CONFIG[backend]['local_path'],
+        frames
+    )
+    click.echo(json.dumps(report, indent=2))
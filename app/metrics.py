@@ -0,0 +1,137 @@
+# app/metrics.py
+
+import os
+import time
+import socket
+from contextlib import contextmanager
+from functools import wraps
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    pushadd_to_gateway,
+    start_http_server,
+)
+
+# Com PROMETHEUS_MULTIPROC_DIR definido (worker prefork, gunicorn com vários
+# processos), cada processo grava as métricas em arquivos nesse diretório e a
+# exportação soma todos eles.
+MULTIPROCESS_ENABLED = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+STAGE_SECONDS = Histogram(
+    'deep_stage_duration_seconds',
+    'Duração de cada etapa do processamento e das chamadas de serviço.',
+    ['stage'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+STAGE_FAILURES = Counter(
+    'deep_stage_failures_total',
+    'Falhas (exceções) por etapa.',
+    ['stage'],
+)
+FRAMES_PER_SECOND = Histogram(
+    'deep_video_frames_per_second',
+    'Frames amostrados analisados por segundo de análise, por vídeo.',
+    buckets=(5, 10, 25, 50, 100, 200, 400, 800, 1600),
+)
+FRAMES_ANALYZED = Counter(
+    'deep_frames_analyzed_total',
+    'Total de frames amostrados analisados.',
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    'deep_task_queue_wait_seconds',
+    'Tempo entre o envio da tarefa para a fila e o início da execução.',
+    ['task'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900, 1800),
+)
+MODEL_LOAD_SECONDS = Histogram(
+    'deep_model_load_seconds',
+    'Tempo de carregamento do modelo (download incluído).',
+    ['backend'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+TASKS_TOTAL = Counter(
+    'deep_tasks_total',
+    'Tarefas finalizadas por resultado.',
+    ['task', 'outcome'],
+)
+PRESIGNED_URL_CACHE = Counter(
+    'deep_presigned_url_cache_total',
+    'Consultas ao cache de URLs pré-assinadas por resultado (local, redis ou miss).',
+    ['result'],
+)
+
+def observe_stage(stage, seconds):
+    """Registra uma duração já medida (ex: tempo acumulado numa thread)."""
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
+
+@contextmanager
+def stage_timer(stage):
+    """Mede a duração do bloco na etapa 'stage' e conta a falha se ele levantar exceção."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.labels(stage=stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - started)
+
+def timed(stage):
+    """Decorador equivalente ao stage_timer, usado nas funções dos serviços."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def collect_registry():
+    """Registro exportado: o padrão, ou a soma dos processos no modo multiprocesso."""
+    if not MULTIPROCESS_ENABLED:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+def metrics_view():
+    """Endpoint /metrics da API."""
+    return generate_latest(collect_registry()), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+def start_metrics_server(port):
+    """Servidor HTTP de métricas do worker (chamado no processo principal)."""
+    start_http_server(port, registry=collect_registry())
+    print(f"Métricas do worker expostas na porta {port}.")
+
+def push_metrics(gateway_url, job):
+    """Envia as métricas deste processo para um Pushgateway (agrupadas por host e PID)."""
+    try:
+        pushadd_to_gateway(
+            gateway_url, job=job, registry=REGISTRY,
+            grouping_key={'instance': f"{socket.gethostname()}:{os.getpid()}"}
+        )
+    except Exception as e:
+        print(f"Erro ao enviar métricas para o Pushgateway: {e}")
+
+def register_publish_hook():
+    """Marca cada tarefa enviada com o horário de envio (usado em deep_task_queue_wait_seconds)."""
+    from celery.signals import before_task_publish
+
+    @before_task_publish.connect(weak=False)
+    def add_enqueued_at(headers=None, **kwargs):
+        if headers is not None:
+            headers.setdefault('enqueued_at', time.time())
+
+def observe_queue_wait(task_name, enqueued_at):
+    if enqueued_at:
+        QUEUE_WAIT_SECONDS.labels(task=task_name).observe(max(time.time() - float(enqueued_at), 0.0))
+
+def mark_process_dead(pid):
+    """Remove os arquivos de métricas de um processo encerrado (modo multiprocesso)."""
+    if MULTIPROCESS_ENABLED:
+        multiprocess.mark_process_dead(pid)
@@ -12,6 +12,8 @@ class Frame(db.Model):
     
     # Coluna JSON para armazenar todas as emoções e confianças
     emotions = db.Column(JSON, nullable=True)
+    # Indica que as confianças foram repetidas do frame anterior (frame quase idêntico, sem inferência)
+    carried_forward = db.Column(db.Boolean, nullable=False, default=False)
 
     # Relacionamento (usa uma string 'Video' para evitar importações circulares)
     video = db.relationship('Video', back_populates='frames')
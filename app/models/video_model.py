@@ -21,6 +21,14 @@ class Video(db.Model):
     status = db.Column(db.Enum(VideoStatus, native_enum=False), nullable=False, default=VideoStatus.PENDING)
     frame_count = db.Column(db.Integer, default=0)
     duration_seconds = db.Column(db.Float, default=0.0)
+    # Fração dos frames amostrados que reaproveitaram a predição anterior
+    skip_ratio = db.Column(db.Float, default=0.0)
+    # Último frame já gravado no processamento em blocos (permite retomar após falha)
+    checkpoint_frame = db.Column(db.Integer, nullable=True)
+    # SHA-256 do conteúdo combinado com a versão do modelo e a amostragem (cache de resultados)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
+    # Chave do último perfil de processamento (.zip) no armazenamento, se houver
+    profile_key = db.Column(db.String(255), nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     processed_at = db.Column(db.DateTime, nullable=True)
 
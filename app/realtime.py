@@ -0,0 +1,120 @@
+# app/realtime.py
+
+import time
+from flask import current_app, request
+from flask_jwt_extended import decode_token
+from flask_socketio import join_room
+
+PROGRESS_EVENT = 'processing_update'
+TERMINAL_STATUSES = ('COMPLETED', 'FAILED')
+# Tentativas de envio dos eventos finais (COMPLETED/FAILED)
+TERMINAL_EMIT_ATTEMPTS = 3
+
+def user_room(user_id):
+    """Sala do Socket.IO que recebe os eventos de todos os vídeos de um usuário."""
+    return f"user:{user_id}"
+
+class ProgressEmitter:
+    """
+    Envia o progresso de um vídeo apenas para a sala do dono, agrupando as
+    atualizações: um evento PROCESSING só sai quando o progresso avançou
+    'min_delta' pontos ou quando passaram 'min_interval' segundos desde o último
+    envio. Os eventos finais (COMPLETED/FAILED) sempre são enviados.
+
+    Com 'status_store', cada evento enviado também é registrado (status,
+    progresso, etapa e ETA) para o endpoint de status.
+    """
+
+    def __init__(self, socketio, video_id, user_id, min_interval=1.0, min_delta=5, status_store=None):
+        self.socketio = socketio
+        self.video_id = video_id
+        self.user_id = user_id
+        self.room = user_room(user_id)
+        self.min_interval = min_interval
+        self.min_delta = min_delta
+        self.status_store = status_store
+        self.stage = None
+        self.last_progress = None
+        self.last_emit = 0.0
+        self.started_at = None
+        self.start_progress = 0
+
+    @classmethod
+    def from_config(cls, socketio, video_id, user_id, config, status_store=None):
+        return cls(
+            socketio, video_id, user_id,
+            min_interval=config.get('PROGRESS_MIN_INTERVAL', 1.0),
+            min_delta=config.get('PROGRESS_MIN_DELTA', 5),
+            status_store=status_store
+        )
+
+    def update(self, progress, status='PROCESSING', stage=None):
+        """Envia o progresso se a variação, o tempo ou a mudança de etapa justificarem."""
+        stage_changed = stage is not None and stage != self.stage
+        if stage is not None:
+            self.stage = stage
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+            self.start_progress = progress
+
+        if self.last_progress is not None and not stage_changed:
+            if progress <= self.last_progress:
+                return False
+            elapsed = time.monotonic() - self.last_emit
+            if progress - self.last_progress < self.min_delta and elapsed < self.min_interval:
+                return False
+        return self._emit(status, progress, attempts=1)
+
+    def finish(self, status):
+        """Envia o evento final (nunca é descartado pelo agrupamento)."""
+        progress = 100 if status == 'COMPLETED' else 0
+        self.stage = None
+        return self._emit(status, progress, attempts=TERMINAL_EMIT_ATTEMPTS)
+
+    def eta_seconds(self, progress):
+        """Estimativa linear do tempo restante a partir do ritmo desde a primeira atualização."""
+        if self.started_at is None or progress <= self.start_progress or progress >= 100:
+            return None
+        elapsed = time.monotonic() - self.started_at
+        return elapsed / (progress - self.start_progress) * (100 - progress)
+
+    def _emit(self, status, progress, attempts):
+        if self.status_store:
+            eta = self.eta_seconds(progress) if status not in TERMINAL_STATUSES else None
+            self.status_store(self.video_id, self.user_id, status, progress, self.stage, eta)
+
+        payload = {'video_id': self.video_id, 'status': status, 'progress': progress}
+        for attempt in range(1, attempts + 1):
+            try:
+                self.socketio.emit(PROGRESS_EVENT, payload, to=self.room)
+                self.last_progress = progress
+                self.last_emit = time.monotonic()
+                return True
+            except Exception as e:
+                # Falha no envio não deve derrubar o processamento do vídeo
+                print(f"Erro ao enviar progresso do vídeo {self.video_id} (tentativa {attempt}/{attempts}): {e}")
+                if attempt < attempts:
+                    time.sleep(0.5 * attempt)
+        return False
+
+def register_socket_handlers(socketio):
+    """
+    Autentica as conexões Socket.IO com o JWT da API e coloca cada cliente na
+    sala do seu usuário. O token vem no 'auth' do handshake ({"token": "..."})
+    ou no parâmetro de query 'token'.
+    """
+
+    @socketio.on('connect')
+    def handle_connect(auth=None):
+        token = (auth or {}).get('token') or request.args.get('token')
+        if not token:
+            return False
+
+        try:
+            decoded = decode_token(token)
+        except Exception as e:
+            print(f"Conexão Socket.IO recusada: token inválido ({e})")
+            return False
+
+        user_id = decoded[current_app.config.get('JWT_IDENTITY_CLAIM', 'sub')]
+        join_room(user_room(user_id))
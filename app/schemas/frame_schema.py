@@ -4,7 +4,7 @@ from app.models import Frame
 from marshmallow import post_dump
 
 # Importe a lista de rótulos para garantir a ordem correta
-from app.tasks.process_video_task import EMOTION_LABELS
+from app.task_interface import EMOTION_LABELS
 
 class FrameSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -9,6 +9,9 @@ class VideoSchema(ma.SQLAlchemyAutoSchema):
         model = Video
         load_instance = True
         include_fk = True
+        # Colunas internas do processamento: checkpoint dos blocos, chave do
+        # cache de resultados e chave do perfil (servido só a administradores)
+        exclude = ('checkpoint_frame', 'content_hash', 'profile_key')
 
     id = ma.auto_field(dump_only=True)
     status = fields.Enum(VideoStatus, by_value=True, dump_only=True)
@@ -16,7 +19,28 @@ class VideoSchema(ma.SQLAlchemyAutoSchema):
     processed_at = ma.auto_field(dump_only=True)
 
 class VideoDetailSchema(VideoSchema):
-    frames = fields.Nested(FrameSchema, many=True, dump_only=True)
+    """
+    Vídeo com os frames já gravados. Durante o processamento o cliente pede só
+    os novos com ?since_frame=<frames_high_water_mark>, então os frames são
+    passados ao schema em vez de lidos do relacionamento.
+    """
+    frames = fields.Method('get_frames', dump_only=True)
+    frames_high_water_mark = fields.Method('get_frames_high_water_mark', dump_only=True)
+    partial = fields.Method('get_partial', dump_only=True)
+
+    def __init__(self, frames=(), since_frame=None, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = list(frames)
+        self.since_frame = since_frame
+
+    def get_frames(self, video):
+        return FrameSchema(many=True).dump(self.frames)
+
+    def get_frames_high_water_mark(self, video):
+        return self.frames[-1].frame_number if self.frames else self.since_frame
+
+    def get_partial(self, video):
+        return video.status != VideoStatus.COMPLETED
 
 class VideoUpdateSchema(ma.Schema):
     title = fields.String(required=True, validate=validate.Length(min=1, max=255))
\ No newline at end of file
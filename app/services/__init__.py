@@ -10,9 +10,23 @@ from .auth_service import (
 
 from .s3_service import (
     generate_presigned_upload_url,
+    s3_create_multipart_upload,
+    s3_complete_multipart_upload,
+    s3_abort_multipart_upload,
     s3_generate_presigned_get_url, # <-- ALTERADO
     download_video_from_s3,
-    download_model_from_s3
+    open_video_range_reader,
+    download_model_from_s3,
+    upload_profile_to_storage
+)
+
+from .status_service import (
+    record_video_status,
+    get_cached_video_status
+)
+
+from .url_cache_service import (
+    get_cached_presigned_get_url
 )
 
 from .video_service import (
@@ -22,6 +36,14 @@ from .video_service import (
     update_video_status,
     save_analysis_results,
     update_video_details,
+    append_frame_results,
+    get_processing_checkpoint,
+    get_video_frames,
+    finalize_chunked_analysis,
+    set_video_content_hash,
+    set_video_profile_key,
+    find_cached_analysis,
+    copy_analysis_results,
     VideoServiceError
 )
 
@@ -32,14 +54,30 @@ __all__ = [
     'RegistrationError',
     'LoginError',
     'generate_presigned_upload_url',
+    's3_create_multipart_upload',
+    's3_complete_multipart_upload',
+    's3_abort_multipart_upload',
     's3_generate_presigned_get_url',
     'download_video_from_s3',
+    'open_video_range_reader',
     'download_model_from_s3',
+    'upload_profile_to_storage',
+    'record_video_status',
+    'get_cached_video_status',
+    'get_cached_presigned_get_url',
     'create_video_record',
     'get_video_by_id',
     'get_videos_by_user',
     'update_video_status',
     'save_analysis_results',
     'update_video_details',
+    'append_frame_results',
+    'get_processing_checkpoint',
+    'get_video_frames',
+    'finalize_chunked_analysis',
+    'set_video_content_hash',
+    'set_video_profile_key',
+    'find_cached_analysis',
+    'copy_analysis_results',
     'VideoServiceError',
 ]
\ No newline at end of file
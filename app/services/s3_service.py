@@ -1,10 +1,11 @@
 # app/services/s3_service.py
 
-import boto3
+import math
 import os
 import shutil
-from botocore.exceptions import ClientError
+import threading
 from flask import current_app, url_for
+from app.metrics import timed
 
 # --- Funções Locais ---
 
@@ -27,19 +28,112 @@ def local_download_file(bucket_name, object_name, destination_path):
         print(f"Erro ao copiar arquivo local: {e}")
         return False
 
+def local_upload_file(bucket_name, object_name, source_path):
+    """Copia um arquivo para o armazenamento local (pasta 'bucket_name')."""
+    destination_path = os.path.join(current_app.config['LOCAL_STORAGE_PATH'], bucket_name, os.path.basename(object_name))
+    try:
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+        shutil.copy(source_path, destination_path)
+        return True
+    except Exception as e:
+        print(f"Erro ao copiar arquivo para o armazenamento local: {e}")
+        return False
+
+def local_open_range_reader(bucket_name, object_name):
+    """Tamanho e leitor de intervalos de um arquivo do armazenamento local."""
+    source_path = os.path.join(current_app.config['LOCAL_STORAGE_PATH'], bucket_name, os.path.basename(object_name))
+    if not os.path.exists(source_path):
+        print(f"Arquivo local não encontrado em: {source_path}")
+        return None
+
+    def read_range(start, end):
+        with open(source_path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    return os.path.getsize(source_path), read_range
+
 # --- Funções S3 ---
 
-def s3_get_client():
-    """Cria e retorna um cliente S3 configurado."""
-    return boto3.client(
+# Clientes S3 do processo, por credenciais/região/endpoint. Um cliente do botocore
+# é thread-safe e mantém o pool de conexões (TLS) entre as chamadas.
+_s3_clients = {}
+_s3_clients_lock = threading.Lock()
+
+def _reset_s3_clients():
+    """Após um fork, o filho não pode reutilizar os sockets do pai."""
+    global _s3_clients_lock
+    _s3_clients.clear()
+    _s3_clients_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_s3_clients)
+
+def s3_client_settings(config):
+    """Parâmetros que definem um cliente S3 (também usados como chave do cache)."""
+    return (
+        config['AWS_ACCESS_KEY_ID'],
+        config['AWS_SECRET_ACCESS_KEY'],
+        config['AWS_REGION'],
+        config.get('S3_ENDPOINT_URL'),
+        config.get('S3_ADDRESSING_STYLE', 'auto'),
+        config.get('S3_MAX_POOL_CONNECTIONS', 10),
+        config.get('S3_MAX_ATTEMPTS', 5),
+        config.get('S3_RETRY_MODE', 'standard'),
+        config.get('S3_CONNECT_TIMEOUT', 5),
+        config.get('S3_READ_TIMEOUT', 60),
+    )
+
+def s3_create_client(settings):
+    """Cria um cliente S3 novo (sessão própria: a sessão padrão do boto3 não é thread-safe)."""
+    # Import tardio: no modo local (e no boot da API) o boto3 não é carregado
+    import boto3
+    from botocore.config import Config as BotocoreConfig
+
+    (access_key, secret_key, region, endpoint_url, addressing_style,
+     max_pool_connections, max_attempts, retry_mode, connect_timeout, read_timeout) = settings
+    session = boto3.session.Session(
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region
+    )
+    return session.client(
         's3',
-        aws_access_key_id=current_app.config['AWS_ACCESS_KEY_ID'],
-        aws_secret_access_key=current_app.config['AWS_SECRET_ACCESS_KEY'],
-        region_name=current_app.config['AWS_REGION']
+        endpoint_url=endpoint_url,
+        config=BotocoreConfig(
+            max_pool_connections=max_pool_connections,
+            retries={'max_attempts': max_attempts, 'mode': retry_mode},
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            s3={'addressing_style': addressing_style}
+        )
+    )
+
+def s3_get_client():
+    """Retorna o cliente S3 do processo para a configuração atual (criado na primeira chamada)."""
+    settings = s3_client_settings(current_app.config)
+    client = _s3_clients.get(settings)
+    if client is None:
+        with _s3_clients_lock:
+            client = _s3_clients.get(settings)
+            if client is None:
+                client = _s3_clients[settings] = s3_create_client(settings)
+    return client
+
+def s3_transfer_config():
+    """Partes e concorrência dos download_file/upload_file (TransferConfig do boto3)."""
+    from boto3.s3.transfer import TransferConfig
+
+    config = current_app.config
+    return TransferConfig(
+        multipart_threshold=config.get('S3_TRANSFER_MULTIPART_THRESHOLD', 16 * 1024 * 1024),
+        multipart_chunksize=config.get('S3_TRANSFER_CHUNK_SIZE', 16 * 1024 * 1024),
+        max_concurrency=config.get('S3_TRANSFER_MAX_CONCURRENCY', 8)
     )
 
 def s3_generate_presigned_upload_url(object_name, expiration=3600):
     """Gera uma URL pré-assinada para o cliente fazer upload de um VÍDEO."""
+    from botocore.exceptions import ClientError
     s3_client = s3_get_client()
     bucket_name = current_app.config['S3_VIDEOS_BUCKET']
     try:
@@ -53,8 +147,10 @@ def s3_generate_presigned_upload_url(object_name, expiration=3600):
         print(f"Erro ao gerar URL pré-assinada de upload: {e}")
         return None
 
+@timed('storage.presign_get')
 def s3_generate_presigned_get_url(object_name, expiration=3600):
     """Gera uma URL pré-assinada para o cliente visualizar um VÍDEO."""
+    from botocore.exceptions import ClientError
     s3_client = s3_get_client()
     bucket_name = current_app.config['S3_VIDEOS_BUCKET']
     try:
@@ -68,18 +164,105 @@ def s3_generate_presigned_get_url(object_name, expiration=3600):
 
 def s3_download_file(bucket_name, object_name, destination_path):
     """Função genérica para baixar um arquivo de um bucket S3."""
+    from botocore.exceptions import ClientError
     s3_client = s3_get_client()
     try:
         os.makedirs(os.path.dirname(destination_path), exist_ok=True)
-        s3_client.download_file(bucket_name, object_name, destination_path)
+        s3_client.download_file(bucket_name, object_name, destination_path, Config=s3_transfer_config())
         print(f"Arquivo {object_name} do S3 baixado para {destination_path}.")
         return True
     except ClientError as e:
         print(f"Erro ao baixar arquivo do S3: {e}")
         return False
 
+def s3_open_range_reader(bucket_name, object_name):
+    """Tamanho (HEAD) e leitor de intervalos (GET com Range) de um objeto do S3."""
+    from botocore.exceptions import ClientError
+    s3_client = s3_get_client()
+    try:
+        size = s3_client.head_object(Bucket=bucket_name, Key=object_name)['ContentLength']
+    except ClientError as e:
+        print(f"Erro ao consultar o objeto no S3: {e}")
+        return None
+
+    def read_range(start, end):
+        response = s3_client.get_object(Bucket=bucket_name, Key=object_name, Range=f"bytes={start}-{end - 1}")
+        return response['Body'].read()
+
+    return size, read_range
+
+# Limites do S3 para upload multipart
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10000
+
+def multipart_part_size(file_size, preferred_part_size):
+    """Tamanho das partes: o configurado, aumentado se o arquivo precisar de mais de 10.000 partes."""
+    return max(preferred_part_size, S3_MIN_PART_SIZE, math.ceil(file_size / S3_MAX_PARTS))
+
+@timed('storage.multipart_init')
+def s3_create_multipart_upload(object_name, file_size):
+    """
+    Inicia um upload multipart no bucket de vídeos e pré-assina o upload_part de
+    cada parte. Retorna {'upload_id', 'part_size', 'parts': [{'part_number', 'url'}]}.
+    """
+    from botocore.exceptions import ClientError
+    s3_client = s3_get_client()
+    bucket_name = current_app.config['S3_VIDEOS_BUCKET']
+    part_size = multipart_part_size(file_size, current_app.config.get('S3_MULTIPART_PART_SIZE', 16 * 1024 * 1024))
+    expiration = current_app.config.get('S3_MULTIPART_URL_EXPIRATION', 21600)
+    try:
+        upload_id = s3_client.create_multipart_upload(Bucket=bucket_name, Key=object_name)['UploadId']
+        parts = [
+            {
+                'part_number': part_number,
+                'url': s3_client.generate_presigned_url(
+                    'upload_part',
+                    Params={'Bucket': bucket_name, 'Key': object_name, 'UploadId': upload_id, 'PartNumber': part_number},
+                    ExpiresIn=expiration
+                )
+            }
+            for part_number in range(1, max(math.ceil(file_size / part_size), 1) + 1)
+        ]
+        return {'upload_id': upload_id, 'part_size': part_size, 'parts': parts}
+    except ClientError as e:
+        print(f"Erro ao iniciar o upload multipart: {e}")
+        return None
+
+@timed('storage.multipart_complete')
+def s3_complete_multipart_upload(object_name, upload_id, parts):
+    """Une as partes enviadas ('parts': [{'part_number', 'etag'}]) no objeto final."""
+    from botocore.exceptions import ClientError
+    s3_client = s3_get_client()
+    try:
+        s3_client.complete_multipart_upload(
+            Bucket=current_app.config['S3_VIDEOS_BUCKET'],
+            Key=object_name,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': [
+                {'PartNumber': int(part['part_number']), 'ETag': part['etag']}
+                for part in sorted(parts, key=lambda part: int(part['part_number']))
+            ]}
+        )
+        return True
+    except ClientError as e:
+        print(f"Erro ao concluir o upload multipart: {e}")
+        return False
+
+@timed('storage.multipart_abort')
+def s3_abort_multipart_upload(object_name, upload_id):
+    """Cancela o upload multipart e descarta as partes já enviadas."""
+    from botocore.exceptions import ClientError
+    s3_client = s3_get_client()
+    try:
+        s3_client.abort_multipart_upload(Bucket=current_app.config['S3_VIDEOS_BUCKET'], Key=object_name, UploadId=upload_id)
+        return True
+    except ClientError as e:
+        print(f"Erro ao cancelar o upload multipart: {e}")
+        return False
+
 # --- Dispatchers (Decidem qual função usar) ---
 
+@timed('storage.presign_upload')
 def generate_presigned_upload_url(object_name, expiration=3600):
     storage_type = current_app.config.get('STORAGE_TYPE', 's3')
     if storage_type == 'local':
@@ -95,6 +278,18 @@ def generate_presigned_get_url(object_name, expiration=3600):
     else:
         return s3_generate_presigned_get_url(object_name, expiration)
 
+def s3_upload_file(bucket_name, object_name, source_path):
+    """Função genérica para enviar um arquivo para um bucket S3."""
+    from botocore.exceptions import ClientError
+    s3_client = s3_get_client()
+    try:
+        s3_client.upload_file(source_path, bucket_name, object_name, Config=s3_transfer_config())
+        return True
+    except ClientError as e:
+        print(f"Erro ao enviar arquivo para o S3: {e}")
+        return False
+
+@timed('storage.download_video')
 def download_video_from_s3(video_s3_key, destination_path):
     storage_type = current_app.config.get('STORAGE_TYPE', 's3')
     if storage_type == 'local':
@@ -103,6 +298,20 @@ def download_video_from_s3(video_s3_key, destination_path):
         bucket_name = current_app.config['S3_VIDEOS_BUCKET']
         return s3_download_file(bucket_name, video_s3_key, destination_path)
 
+@timed('storage.open_video_reader')
+def open_video_range_reader(video_s3_key):
+    """
+    Retorna (tamanho, read_range(start, end)) do vídeo, ou None se ele não existir.
+    O read_range não depende do contexto da aplicação: pode ser chamado de outras threads.
+    """
+    storage_type = current_app.config.get('STORAGE_TYPE', 's3')
+    if storage_type == 'local':
+        return local_open_range_reader('videos', video_s3_key)
+    else:
+        bucket_name = current_app.config['S3_VIDEOS_BUCKET']
+        return s3_open_range_reader(bucket_name, video_s3_key)
+
+@timed('storage.download_model')
 def download_model_from_s3(model_s3_key, destination_path):
     storage_type = current_app.config.get('STORAGE_TYPE', 's3')
     if storage_type == 'local':
@@ -116,4 +325,15 @@ def download_model_from_s3(model_s3_key, destination_path):
             return s3_download_file(bucket_name, model_s3_key, destination_path)
 
     print(f"Modelo {destination_path} já existe localmente.")
-    return True
\ No newline at end of file
+    return True
+
+@timed('storage.upload_profile')
+def upload_profile_to_storage(profile_key, source_path):
+    """Envia o perfil de uma tarefa (.zip) para o armazenamento, ao lado do vídeo."""
+    storage_type = current_app.config.get('STORAGE_TYPE', 's3')
+    if storage_type == 'local':
+        # Pasta separada: a pasta 'videos' é servida sem autenticação pelo /videos/stream
+        return local_upload_file('profiles', profile_key, source_path)
+    else:
+        bucket_name = current_app.config['S3_VIDEOS_BUCKET']
+        return s3_upload_file(bucket_name, profile_key, source_path)
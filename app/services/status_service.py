@@ -0,0 +1,68 @@
+# app/services/status_service.py
+
+import time
+import redis
+from flask import current_app
+
+# Hash por vídeo com o estado do processamento (status, progresso, etapa, ETA e dono)
+STATUS_KEY_PREFIX = 'video_status:'
+
+_redis_clients = {}
+
+def get_status_redis():
+    """Retorna o cliente Redis do status (um por URL, reaproveitado entre requisições)."""
+    url = current_app.config['STATUS_REDIS_URL']
+    client = _redis_clients.get(url)
+    if client is None:
+        timeout = current_app.config.get('STATUS_REDIS_TIMEOUT', 0.5)
+        client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=timeout, socket_connect_timeout=timeout)
+        _redis_clients[url] = client
+    return client
+
+def record_video_status(video_id, user_id, status, progress, stage=None, eta_seconds=None):
+    """
+    Atualiza o hash de status do vídeo (expira após STATUS_TTL_SECONDS).
+    Erros do Redis são apenas registrados: o status no MySQL continua sendo a fonte final.
+    Sem STATUS_REDIS_URL (ex: benchmarks) não faz nada.
+    """
+    if not current_app.config.get('STATUS_REDIS_URL'):
+        return False
+    mapping = {
+        'user_id': user_id,
+        'status': status,
+        'progress': progress,
+        'stage': stage or '',
+        'eta_seconds': '' if eta_seconds is None else round(eta_seconds, 1),
+        'updated_at': round(time.time(), 3),
+    }
+    try:
+        key = STATUS_KEY_PREFIX + video_id
+        pipe = get_status_redis().pipeline(transaction=False)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, current_app.config.get('STATUS_TTL_SECONDS', 86400))
+        pipe.execute()
+        return True
+    except redis.RedisError as e:
+        print(f"Erro ao registrar o status do vídeo {video_id} no Redis: {e}")
+        return False
+
+def get_cached_video_status(video_id):
+    """Lê o hash de status do vídeo; retorna None se expirou ou se o Redis estiver indisponível."""
+    if not current_app.config.get('STATUS_REDIS_URL'):
+        return None
+    try:
+        data = get_status_redis().hgetall(STATUS_KEY_PREFIX + video_id)
+    except redis.RedisError as e:
+        print(f"Erro ao ler o status do vídeo {video_id} no Redis: {e}")
+        return None
+    if not data:
+        return None
+
+    return {
+        'user_id': data.get('user_id'),
+        'status': data.get('status'),
+        'progress': int(float(data.get('progress') or 0)),
+        'stage': data.get('stage') or None,
+        'eta_seconds': float(data['eta_seconds']) if data.get('eta_seconds') else None,
+        'updated_at': float(data.get('updated_at') or 0),
+    }
@@ -0,0 +1,92 @@
+# app/services/url_cache_service.py
+
+import threading
+import time
+from collections import OrderedDict
+import redis
+from flask import current_app
+from app.metrics import PRESIGNED_URL_CACHE
+from .s3_service import s3_generate_presigned_get_url
+from .status_service import get_status_redis
+
+PRESIGNED_URL_KEY_PREFIX = 'presigned_get:'
+
+class PresignedUrlLRU:
+    """LRU do processo com validade por entrada (URL, instante até o qual pode ser reutilizada)."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            url, valid_until = entry
+            if valid_until <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return url
+
+    def set(self, key, url, valid_until):
+        with self.lock:
+            self.entries[key] = (url, valid_until)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+_local_cache = None
+
+def get_local_url_cache():
+    global _local_cache
+    if _local_cache is None:
+        _local_cache = PresignedUrlLRU(current_app.config.get('PRESIGNED_URL_LRU_SIZE', 1024))
+    return _local_cache
+
+def get_cached_presigned_get_url(object_name):
+    """
+    URL pré-assinada de leitura do vídeo, reaproveitada enquanto ainda faltar mais
+    que PRESIGNED_URL_SAFETY_MARGIN segundos para expirar. A mesma URL entre
+    requisições também deixa o navegador e a CDN reaproveitarem os bytes do vídeo.
+    Ordem: LRU do processo, Redis (compartilhado entre os processos da API), S3.
+    """
+    expiration = current_app.config.get('PRESIGNED_URL_EXPIRATION', 3600)
+    if not current_app.config.get('PRESIGNED_URL_CACHE_ENABLED', True):
+        return s3_generate_presigned_get_url(object_name, expiration)
+
+    key = f"{PRESIGNED_URL_KEY_PREFIX}{current_app.config['S3_VIDEOS_BUCKET']}:{object_name}"
+    local_cache = get_local_url_cache()
+    url = local_cache.get(key)
+    if url:
+        PRESIGNED_URL_CACHE.labels(result='local').inc()
+        return url
+
+    use_redis = bool(current_app.config.get('STATUS_REDIS_URL'))
+    if use_redis:
+        try:
+            url, ttl = get_status_redis().pipeline(transaction=False).get(key).ttl(key).execute()
+            if url:
+                # O TTL restante no Redis é exatamente a validade que ainda pode ser usada
+                local_cache.set(key, url, time.time() + max(ttl, 0))
+                PRESIGNED_URL_CACHE.labels(result='redis').inc()
+                return url
+        except redis.RedisError as e:
+            print(f"Erro ao ler a URL pré-assinada de {object_name} no Redis: {e}")
+            use_redis = False
+
+    PRESIGNED_URL_CACHE.labels(result='miss').inc()
+    url = s3_generate_presigned_get_url(object_name, expiration)
+    reusable_seconds = expiration - current_app.config.get('PRESIGNED_URL_SAFETY_MARGIN', 300)
+    if not url or reusable_seconds <= 0:
+        return url
+
+    local_cache.set(key, url, time.time() + reusable_seconds)
+    if use_redis:
+        try:
+            get_status_redis().set(key, url, ex=reusable_seconds)
+        except redis.RedisError as e:
+            print(f"Erro ao gravar a URL pré-assinada de {object_name} no Redis: {e}")
+    return url
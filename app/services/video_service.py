@@ -3,6 +3,7 @@
 from app.extensions import db
 from app.models import Video, Frame, VideoStatus
 from datetime import datetime
+from app.metrics import timed
 
 class VideoServiceError(Exception):
     pass
@@ -45,6 +46,7 @@ def update_video_status(video_id, new_status):
     db.session.commit()
     return video
 
+@timed('db.save_analysis_results')
 def save_analysis_results(video_id, analysis_data):
     """
     Salva os resultados completos da análise no banco de dados.
@@ -57,6 +59,7 @@ def save_analysis_results(video_id, analysis_data):
     try:
         video.frame_count = analysis_data.get('total_frames_analyzed', 0)
         video.duration_seconds = analysis_data.get('duration_seconds', 0.0)
+        video.skip_ratio = analysis_data.get('skip_ratio', 0.0)
         video.processed_at = datetime.utcnow()
         video.status = VideoStatus.COMPLETED
 
@@ -66,7 +69,8 @@ def save_analysis_results(video_id, analysis_data):
                 video_id=video.id,
                 frame_number=frame_data['frame_number'],
                 video_timestamp_sec=frame_data['timestamp'],
-                emotions=frame_data['emotions'] # Grava o dicionário JSON
+                emotions=frame_data['emotions'], # Grava o dicionário JSON
+                carried_forward=frame_data.get('carried_forward', False)
             )
             frames_to_add.append(frame)
 
@@ -82,6 +86,158 @@ def save_analysis_results(video_id, analysis_data):
         print(f"Erro ao salvar resultados da análise: {e}")
         raise VideoServiceError("Falha ao salvar os resultados da análise.")
 
+@timed('db.append_frame_results')
+def append_frame_results(video_id, frames, sampled_frames):
+    """
+    Persiste um bloco de frames analisados e atualiza o checkpoint do vídeo na
+    mesma transação: 'checkpoint_frame' passa a ser o último frame gravado e
+    'frame_count' o total de frames amostrados até aqui.
+    """
+    video = get_video_by_id(video_id)
+    if not video:
+        raise VideoServiceError("Vídeo não encontrado.")
+
+    try:
+        frames_to_add = [
+            Frame(
+                video_id=video.id,
+                frame_number=frame_data['frame_number'],
+                video_timestamp_sec=frame_data['timestamp'],
+                emotions=frame_data['emotions'],
+                carried_forward=frame_data.get('carried_forward', False)
+            )
+            for frame_data in frames
+        ]
+        if frames_to_add:
+            db.session.bulk_save_objects(frames_to_add)
+            video.checkpoint_frame = max(frame.frame_number for frame in frames_to_add)
+        video.frame_count = sampled_frames
+        db.session.commit()
+        return video
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erro ao salvar bloco de frames: {e}")
+        raise VideoServiceError("Falha ao salvar o bloco de frames da análise.")
+
+def get_processing_checkpoint(video_id):
+    """
+    Retorna o checkpoint de um processamento interrompido como um dicionário
+    (frame_number, timestamp e frames amostrados), ou None se não houver.
+    """
+    video = get_video_by_id(video_id)
+    if not video or video.checkpoint_frame is None:
+        return None
+
+    frame = Frame.query.filter_by(video_id=video_id, frame_number=video.checkpoint_frame).first()
+    if not frame:
+        return None
+    return {
+        'frame_number': frame.frame_number,
+        'timestamp': frame.video_timestamp_sec,
+        'sampled_frames': video.frame_count or 0,
+    }
+
+@timed('db.get_video_frames')
+def get_video_frames(video_id, since_frame=None):
+    """
+    Retorna os frames já gravados do vídeo em ordem de frame_number.
+    Com 'since_frame', retorna apenas os frames posteriores a ele (leitura incremental
+    enquanto o vídeo ainda está em processamento).
+    """
+    query = Frame.query.filter_by(video_id=video_id)
+    if since_frame is not None:
+        query = query.filter(Frame.frame_number > since_frame)
+    return query.order_by(Frame.frame_number).all()
+
+@timed('db.finalize_chunked_analysis')
+def finalize_chunked_analysis(video_id, duration_seconds):
+    """Conclui um processamento em blocos: os frames já foram gravados por append_frame_results."""
+    video = get_video_by_id(video_id)
+    if not video:
+        raise VideoServiceError("Vídeo não encontrado.")
+
+    try:
+        carried_forward_frames = Frame.query.filter_by(video_id=video_id, carried_forward=True).count()
+        video.duration_seconds = duration_seconds
+        video.skip_ratio = carried_forward_frames / video.frame_count if video.frame_count else 0.0
+        video.processed_at = datetime.utcnow()
+        video.status = VideoStatus.COMPLETED
+        db.session.commit()
+        return video
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erro ao concluir a análise em blocos: {e}")
+        raise VideoServiceError("Falha ao concluir a análise do vídeo.")
+
+def set_video_profile_key(video_id, profile_key):
+    """Registra a chave do último perfil de processamento do vídeo no armazenamento."""
+    video = get_video_by_id(video_id)
+    if not video:
+        raise VideoServiceError("Vídeo não encontrado.")
+
+    video.profile_key = profile_key
+    db.session.commit()
+    return video
+
+def set_video_content_hash(video_id, content_hash):
+    """Registra a chave de cache (hash do conteúdo + modelo + amostragem) do vídeo."""
+    video = get_video_by_id(video_id)
+    if not video:
+        raise VideoServiceError("Vídeo não encontrado.")
+
+    video.content_hash = content_hash
+    db.session.commit()
+    return video
+
+@timed('db.find_cached_analysis')
+def find_cached_analysis(content_hash, user_id, exclude_video_id=None):
+    """
+    Busca um vídeo já processado com a mesma chave de cache.
+    Só considera vídeos do mesmo usuário: resultados nunca são
+    compartilhados entre contas.
+    """
+    query = Video.query.filter_by(content_hash=content_hash, user_id=user_id, status=VideoStatus.COMPLETED)
+    if exclude_video_id:
+        query = query.filter(Video.id != exclude_video_id)
+    return query.order_by(Video.processed_at.desc()).first()
+
+@timed('db.copy_analysis_results')
+def copy_analysis_results(source_video, video_id):
+    """
+    Copia os frames analisados de 'source_video' para o vídeo 'video_id'
+    com um único INSERT ... SELECT no banco, sem trafegar os frames pela aplicação.
+    """
+    video = get_video_by_id(video_id)
+    if not video:
+        raise VideoServiceError("Vídeo não encontrado.")
+
+    try:
+        frames_select = db.select(
+            db.literal(video.id),
+            Frame.frame_number,
+            Frame.video_timestamp_sec,
+            Frame.emotions,
+            Frame.carried_forward
+        ).where(Frame.video_id == source_video.id)
+        db.session.execute(
+            db.insert(Frame).from_select(
+                ['video_id', 'frame_number', 'video_timestamp_sec', 'emotions', 'carried_forward'],
+                frames_select
+            )
+        )
+
+        video.frame_count = source_video.frame_count
+        video.duration_seconds = source_video.duration_seconds
+        video.skip_ratio = source_video.skip_ratio
+        video.processed_at = datetime.utcnow()
+        video.status = VideoStatus.COMPLETED
+        db.session.commit()
+        return video
+    except Exception as e:
+        db.session.rollback()
+        print(f"Erro ao copiar resultados da análise: {e}")
+        raise VideoServiceError("Falha ao copiar os resultados da análise.")
+
 def update_video_details(video_id, user_id, data):
     """
     Atualiza os detalhes de um vídeo, como o título.
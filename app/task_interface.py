@@ -0,0 +1,42 @@
+# app/task_interface.py
+
+import os
+from flask import current_app
+
+# Interface leve entre a API e o worker: metadados do modelo e assinatura das
+# tarefas. A API importa só este módulo e enfileira as tarefas pelo nome, sem
+# carregar o pacote app.tasks (TensorFlow, OpenCV e o SocketIO do worker).
+
+# Nome registrado no Celery (o decorator do process_video usa esta constante)
+PROCESS_VIDEO_TASK = 'app.tasks.process_video_task.process_video'
+
+# --- CONFIGURAÇÃO DO NOVO MODELO ÚNICO ---
+# Aponta para o seu novo modelo único
+MODEL_CONFIG = {
+    's3_key': 'models/modelo_emocoes.h5',
+    'local_path': 'models/modelo_emocoes.h5',
+    # Faz parte da chave do cache de resultados: altere ao publicar um novo modelo
+    'version': os.getenv('MODEL_VERSION', 'modelo_emocoes-v1'),
+    # Backend de inferência: 'keras' (.h5), 'tflite' (float32) ou 'tflite_int8' (quantizado)
+    'backend': os.getenv('MODEL_BACKEND', 'keras'),
+    'num_threads': int(os.getenv('TFLITE_NUM_THREADS', 0)) or None,
+    # Variantes geradas a partir do .h5 com 'flask model convert'
+    'tflite': {
+        's3_key': 'models/modelo_emocoes.tflite',
+        'local_path': 'models/modelo_emocoes.tflite'
+    },
+    'tflite_int8': {
+        's3_key': 'models/modelo_emocoes_int8.tflite',
+        'local_path': 'models/modelo_emocoes_int8.tflite'
+    }
+}
+# A ordem dos rótulos foi ajustada para corresponder EXATAMENTE à saída do modelo
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprised']
+
+def enqueue_process_video(video_id, target_fps=None, sampling_mode=None, profile=False):
+    """Enfileira o process_video pelo nome, com a mesma assinatura da tarefa."""
+    return current_app.extensions['celery'].send_task(
+        PROCESS_VIDEO_TASK,
+        args=[video_id],
+        kwargs={'target_fps': target_fps, 'sampling_mode': sampling_mode, 'profile': profile}
+    )
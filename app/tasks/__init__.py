@@ -1,5 +1,6 @@
 # app/tasks/__init__.py
 
 from .process_video_task import process_video
+from .segment_tasks import process_video_segment, merge_video_segments, mark_video_failed
 
-__all__ = ['process_video']
\ No newline at end of file
+__all__ = ['process_video', 'process_video_segment', 'merge_video_segments', 'mark_video_failed']
\ No newline at end of file
@@ -0,0 +1,48 @@
+# app/tasks/adaptive_sampling.py
+
+import numpy as np
+
+def confidence_distance(confidences_a, confidences_b):
+    """Distância de variação total (0 a 1) entre duas distribuições de confiança."""
+    return float(np.abs(np.asarray(confidences_a) - np.asarray(confidences_b)).sum() / 2.0)
+
+def select_adaptive_frames(frames_buffer, predict_batch, coarse_stride, change_threshold):
+    """
+    Amostragem adaptativa por bisseção sobre os frames candidatos (já na taxa alvo).
+
+    1. Passada grossa: prediz um frame a cada 'coarse_stride' candidatos (e o último).
+    2. Para cada par de frames vizinhos já preditos cuja distribuição mudou mais
+       que 'change_threshold', prediz o frame do meio do intervalo.
+    3. Repete o passo 2 até não haver mudanças ou os intervalos chegarem
+       a um único frame (a taxa alvo).
+
+    Cada nível da bisseção é enviado ao modelo em um único lote.
+    'predict_batch' recebe um buffer uint8 (N, 48, 48, 1) e retorna uma lista
+    alinhada de confianças (ou None). Retorna {índice do candidato: confianças}.
+    """
+    total = len(frames_buffer)
+    if total == 0:
+        return {}
+
+    coarse_stride = max(int(coarse_stride), 1)
+    indexes = sorted(set(range(0, total, coarse_stride)) | {total - 1})
+    predictions = {}
+    attempted = set()
+
+    while indexes:
+        attempted.update(indexes)
+        batch_confidences = predict_batch(frames_buffer[indexes])
+        for index, confidences in zip(indexes, batch_confidences):
+            if confidences is not None:
+                predictions[index] = confidences
+
+        evaluated = sorted(predictions)
+        next_indexes = []
+        for start, end in zip(evaluated, evaluated[1:]):
+            if end - start > 1 and confidence_distance(predictions[start], predictions[end]) > change_threshold:
+                next_indexes.append((start + end) // 2)
+
+        # Evita repetir índices cuja predição falhou
+        indexes = sorted(set(next_indexes) - attempted)
+
+    return predictions
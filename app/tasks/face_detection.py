@@ -0,0 +1,188 @@
+# app/tasks/face_detection.py
+
+import cv2
+
+# Largura usada para detecção/rastreamento (frames maiores são reduzidos antes)
+DETECTION_WIDTH = 320
+# Margem extra em volta do rosto detectado, em fração do tamanho da caixa
+FACE_MARGIN = 0.15
+DNN_CONFIDENCE_THRESHOLD = 0.5
+
+# Diferença absoluta média (0-255) entre o recorte atual e o rosto detectado
+# acima da qual o rosto é considerado perdido (FACE_LOSS_THRESHOLD na config)
+FACE_LOSS_THRESHOLD = 40.0
+# Tamanho dos recortes comparados na verificação de perda
+LOSS_CHECK_SIZE = 24
+# Trackers cuja atualização não usa amostragem aleatória
+DETERMINISTIC_TRACKERS = ('TrackerKCF',)
+
+def create_tracker():
+    """
+    Cria um tracker KCF, ou None se a build do OpenCV não o oferecer (o
+    opencv-python sem contrib não tem). Trackers mais caros, como o MIL, não
+    são usados: custam mais por frame que a própria detecção Haar e não são
+    determinísticos.
+    """
+    for module in (cv2, getattr(cv2, 'legacy', None)):
+        factory = getattr(module, 'TrackerKCF_create', None)
+        if factory:
+            return factory()
+    return None
+
+def tracking_is_deterministic():
+    """
+    Indica se a localização dá o mesmo resultado independentemente de onde o
+    processamento começou (usado pelo fan-out). Vale para a caixa reaproveitada
+    e para o KCF; um tracker aleatório tornaria os trechos diferentes do serial.
+    """
+    tracker = create_tracker()
+    return tracker is None or type(tracker).__name__ in DETERMINISTIC_TRACKERS
+
+class HaarFaceDetector:
+    """Detector Haar Cascade que acompanha o pacote opencv-python."""
+
+    def __init__(self, cascade_path=None):
+        cascade_path = cascade_path or cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        self.classifier = cv2.CascadeClassifier(cascade_path)
+        if self.classifier.empty():
+            raise FileNotFoundError(f"Cascade Haar não encontrado em: {cascade_path}")
+
+    def detect(self, small_bgr, small_gray):
+        faces = self.classifier.detectMultiScale(small_gray, scaleFactor=1.1, minNeighbors=5, minSize=(24, 24))
+        return [tuple(int(v) for v in face) for face in faces]
+
+class DnnFaceDetector:
+    """Detector SSD (res10 300x300) carregado pelo módulo cv2.dnn."""
+
+    def __init__(self, prototxt_path, model_path):
+        if not prototxt_path or not model_path:
+            raise ValueError("O detector 'dnn' exige FACE_DNN_PROTOTXT e FACE_DNN_MODEL.")
+        self.net = cv2.dnn.readNetFromCaffe(prototxt_path, model_path)
+
+    def detect(self, small_bgr, small_gray):
+        height, width = small_bgr.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.resize(small_bgr, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()
+
+        faces = []
+        for i in range(detections.shape[2]):
+            if detections[0, 0, i, 2] < DNN_CONFIDENCE_THRESHOLD:
+                continue
+            x1, y1, x2, y2 = detections[0, 0, i, 3:7] * [width, height, width, height]
+            faces.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+        return faces
+
+class FaceLocator:
+    """
+    Localiza o rosto principal de cada frame amostrado.
+    O detector roda no início de cada ciclo de 'detection_interval' instantes
+    de amostragem ou quando o rosto é perdido; nos frames intermediários a
+    caixa é reaproveitada (ou vem do tracker KCF, se a build do OpenCV o
+    tiver). A perda é detectada comparando o recorte da caixa com o rosto da
+    última detecção. Os ciclos são fixos na grade de amostragem e nada é
+    aleatório, então o resultado não depende de onde o processamento começou.
+    """
+
+    def __init__(self, detector, detection_interval=10, loss_threshold=FACE_LOSS_THRESHOLD):
+        self.detector = detector
+        self.detection_interval = max(int(detection_interval), 1)
+        self.loss_threshold = loss_threshold
+        self.tracker = None
+        self.last_box = None
+        self.reference_crop = None
+        self.detection_cycle = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Cria o localizador a partir da configuração da aplicação, ou None se desativado."""
+        if not config.get('FACE_DETECTION_ENABLED', False):
+            return None
+
+        detector_name = config.get('FACE_DETECTOR', 'haar')
+        if detector_name == 'dnn':
+            detector = DnnFaceDetector(config.get('FACE_DNN_PROTOTXT'), config.get('FACE_DNN_MODEL'))
+        elif detector_name == 'haar':
+            detector = HaarFaceDetector(config.get('FACE_HAAR_CASCADE'))
+        else:
+            raise ValueError(f"Detector de rostos desconhecido: {detector_name}")
+        return cls(detector, config.get('FACE_DETECTION_INTERVAL', 10), config.get('FACE_LOSS_THRESHOLD', FACE_LOSS_THRESHOLD))
+
+    def locate(self, frame, gray_frame, sample_index):
+        """Retorna a caixa (x, y, w, h) do rosto em coordenadas do frame original, ou None."""
+        scale = min(DETECTION_WIDTH / frame.shape[1], 1.0)
+        small_bgr = cv2.resize(frame, None, fx=scale, fy=scale) if scale < 1.0 else frame
+        small_gray = cv2.resize(gray_frame, None, fx=scale, fy=scale) if scale < 1.0 else gray_frame
+
+        cycle = sample_index // self.detection_interval
+        needs_detection = cycle != self.detection_cycle
+        if not needs_detection:
+            if self.last_box is None:
+                # A última detecção não achou rosto: espera o próximo ciclo
+                return None
+            box = self._track(small_bgr, small_gray)
+            needs_detection = box is None
+
+        if needs_detection:
+            box = self._detect(small_bgr, small_gray)
+            self.detection_cycle = cycle
+
+        if box is None:
+            return None
+        return self._to_frame_coordinates(box, scale, frame.shape)
+
+    def _detect(self, small_bgr, small_gray):
+        faces = self.detector.detect(small_bgr, small_gray)
+        if not faces:
+            self.last_box = None
+            self.tracker = None
+            self.reference_crop = None
+            return None
+
+        # Mantém apenas o maior rosto do frame
+        self.last_box = max(faces, key=lambda face: face[2] * face[3])
+        self.reference_crop = self._crop(small_gray, self.last_box)
+        self.tracker = create_tracker()
+        if self.tracker is not None:
+            self.tracker.init(small_bgr, self.last_box)
+        return self.last_box
+
+    def _track(self, small_bgr, small_gray):
+        box = self.last_box
+        if self.tracker is not None:
+            ok, tracked = self.tracker.update(small_bgr)
+            if not ok:
+                # Perda de rastreamento: força uma nova detecção
+                return None
+            box = tuple(int(v) for v in tracked)
+
+        # Verificação barata de perda: o recorte ainda se parece com o rosto detectado?
+        crop = self._crop(small_gray, box)
+        if crop is None or self.reference_crop is None or \
+                float(cv2.absdiff(crop, self.reference_crop).mean()) > self.loss_threshold:
+            return None
+        self.last_box = box
+        return box
+
+    def _crop(self, small_gray, box):
+        """Recorte da caixa em LOSS_CHECK_SIZE x LOSS_CHECK_SIZE, ou None se ela sair do frame."""
+        x, y, w, h = box
+        frame_h, frame_w = small_gray.shape[:2]
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + w, frame_w), min(y + h, frame_h)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return cv2.resize(small_gray[y1:y2, x1:x2], (LOSS_CHECK_SIZE, LOSS_CHECK_SIZE), interpolation=cv2.INTER_AREA)
+
+    def _to_frame_coordinates(self, box, scale, frame_shape):
+        x, y, w, h = (v / scale for v in box)
+        margin_w, margin_h = w * FACE_MARGIN, h * FACE_MARGIN
+        frame_h, frame_w = frame_shape[:2]
+
+        x1 = max(int(x - margin_w), 0)
+        y1 = max(int(y - margin_h), 0)
+        x2 = min(int(x + w + margin_w), frame_w)
+        y2 = min(int(y + h + margin_h), frame_h)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return x1, y1, x2 - x1, y2 - y1
@@ -0,0 +1,192 @@
+# app/tasks/frame_pipeline.py
+
+import math
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+
+# Resolução de entrada do modelo (frames em escala de cinza 48x48)
+FRAME_SIZE = 48
+
+# Tolerância (ms) para erros de arredondamento dos timestamps do container
+TIMESTAMP_TOLERANCE_MS = 0.5
+
+def preprocess_frame(frame, face_locator=None, sample_index=0):
+    """
+    Converte um frame BGR decodificado para o formato de entrada do modelo: (48, 48, 1) em uint8.
+    Com um FaceLocator, apenas o recorte do rosto é enviado ao modelo; se nenhum
+    rosto for encontrado, o frame inteiro é usado.
+    """
+    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if face_locator is not None:
+        face_box = face_locator.locate(frame, gray_frame, sample_index)
+        if face_box is not None:
+            x, y, w, h = face_box
+            gray_frame = gray_frame[y:y + h, x:x + w]
+    # 'nearest' é a mesma interpolação usada anteriormente pelo load_img do Keras
+    resized = cv2.resize(gray_frame, (FRAME_SIZE, FRAME_SIZE), interpolation=cv2.INTER_NEAREST)
+    return resized[..., np.newaxis]
+
+def sample_grid_index(position_ms, sample_period_ms):
+    """Índice do último instante de amostragem alcançado na posição informada."""
+    return math.floor((position_ms + TIMESTAMP_TOLERANCE_MS) / sample_period_ms)
+
+def frame_difference(frame_a, frame_b):
+    """Diferença absoluta média (0-255) entre dois frames já reduzidos para 48x48."""
+    return float(cv2.absdiff(frame_a, frame_b).mean())
+
+class FrameProducer(threading.Thread):
+    """
+    Thread de decodificação do pipeline produtor/consumidor.
+    Lê o vídeo, pré-processa os frames amostrados e publica lotes
+    (buffer uint8 (B, 48, 48, 1), metadados) numa fila limitada. Assim a
+    decodificação e a inferência rodam em paralelo, e a memória fica limitada
+    pelo tamanho da fila e não pela duração do vídeo.
+
+    A amostragem é feita por tempo: todos os frames passam por cap.grab(),
+    mas só são decodificados por completo (cap.retrieve()) os frames que
+    cruzam um novo instante de amostragem, isto é, cujo índice na grade
+    floor(CAP_PROP_POS_MSEC / (1000 / target_fps)) é maior que o do frame
+    anterior. A decisão depende apenas do frame anterior, então um trecho
+    do vídeo ('start_index' <= índice < 'end_index') pode ser processado
+    isoladamente com o mesmo resultado do processamento completo.
+
+    Com 'dedup_threshold' > 0, frames cuja diferença para o último frame
+    enviado ao modelo fica abaixo do limiar não entram no lote: seus metadados
+    saem com 'slot' None e o consumidor repete as confianças anteriores.
+    Nos demais, 'slot' é o índice do frame dentro do buffer do lote.
+    """
+
+    def __init__(self, cap, target_fps, batch_size, queue_size, face_locator=None, dedup_threshold=0.0,
+                 start_index=0, end_index=None):
+        super().__init__(name='frame-producer', daemon=True)
+        self.cap = cap
+        self.face_locator = face_locator
+        self.video_fps = cap.get(cv2.CAP_PROP_FPS)
+        self.sample_period_ms = 1000.0 / target_fps
+        self.batch_size = batch_size
+        self.dedup_threshold = dedup_threshold
+        self.start_index = start_index
+        self.end_index = end_index
+        self.frames_queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        # Tempo acumulado (s) em decodificação e pré-processamento, para as métricas
+        self.decode_seconds = 0.0
+        self.preprocess_seconds = 0.0
+        # Instante (perf_counter) em que o primeiro frame amostrado foi decodificado
+        self.first_frame_at = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            self._start_batch()
+            reference_frame = None
+            c_frame = self._seek()
+            previous_index = None
+
+            while self.cap.isOpened() and not self._stop_event.is_set():
+                started = time.perf_counter()
+                grabbed = self.cap.grab()
+                self.decode_seconds += time.perf_counter() - started
+                if not grabbed: break
+
+                position_ms = self._position_ms(c_frame)
+                sample_index = self.grid_index(position_ms)
+                crosses_sample = previous_index is None or sample_index > previous_index
+                previous_index = sample_index
+
+                if self.end_index is not None and sample_index >= self.end_index:
+                    break
+
+                if crosses_sample and sample_index >= self.start_index:
+                    started = time.perf_counter()
+                    ret, frame = self.cap.retrieve()
+                    decoded = time.perf_counter()
+                    self.decode_seconds += decoded - started
+                    if ret:
+                        if self.first_frame_at is None:
+                            self.first_frame_at = decoded
+                        model_input = preprocess_frame(frame, self.face_locator, sample_index)
+                        self.preprocess_seconds += time.perf_counter() - decoded
+                        frame_info = {'frame_number': c_frame, 'timestamp': position_ms / 1000.0, 'slot': None}
+
+                        if (reference_frame is None or self.dedup_threshold <= 0
+                                or frame_difference(model_input, reference_frame) >= self.dedup_threshold):
+                            frame_info['slot'] = self._inferred_count
+                            self._frames_buffer[self._inferred_count] = model_input
+                            self._inferred_count += 1
+                            reference_frame = model_input
+                        self._frames_info.append(frame_info)
+
+                        # Também limita os metadados, caso muitos frames seguidos sejam repetidos
+                        if self._inferred_count == self.batch_size or len(self._frames_info) >= 4 * self.batch_size:
+                            self._flush_batch()
+                c_frame += 1
+
+            if self._frames_info:
+                self._flush_batch()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.cap.release()
+            # Sentinela: indica ao consumidor que não há mais lotes
+            self._put(None)
+
+    def grid_index(self, position_ms):
+        return sample_grid_index(position_ms, self.sample_period_ms)
+
+    def _seek(self):
+        """
+        Posiciona o vídeo um pouco antes do início do trecho, para que o frame
+        anterior ao primeiro instante do trecho também seja lido.
+        Retorna o número do próximo frame a ser lido.
+        """
+        if self.start_index <= 0:
+            return 0
+
+        frame_period_ms = 1000.0 / self.video_fps if self.video_fps > 0 else self.sample_period_ms
+        seek_ms = max(self.start_index * self.sample_period_ms - 2 * frame_period_ms, 0.0)
+        self.cap.set(cv2.CAP_PROP_POS_MSEC, seek_ms)
+        return int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+    def _position_ms(self, c_frame):
+        position_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        # Alguns backends não informam a posição; estima pelo FPS nominal
+        if position_ms <= 0 and c_frame > 0 and self.video_fps > 0:
+            position_ms = c_frame * 1000.0 / self.video_fps
+        return position_ms
+
+    def _start_batch(self):
+        self._frames_buffer = np.empty((self.batch_size, FRAME_SIZE, FRAME_SIZE, 1), dtype=np.uint8)
+        self._frames_info = []
+        self._inferred_count = 0
+
+    def _flush_batch(self):
+        self._put((self._frames_buffer[:self._inferred_count], self._frames_info))
+        self._start_batch()
+
+    def _put(self, item):
+        # Usa timeout para não ficar bloqueado para sempre se o consumidor parar
+        while not self._stop_event.is_set():
+            try:
+                self.frames_queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def stop(self):
+        """Sinaliza para a thread parar (ex: quando o consumidor falha)."""
+        self._stop_event.set()
+
+    def batches(self):
+        """Gerador consumido pela etapa de inferência; repassa erros da decodificação."""
+        while True:
+            item = self.frames_queue.get()
+            if item is None:
+                break
+            yield item
+
+        if self.error:
+            raise self.error
@@ -0,0 +1,87 @@
+# app/tasks/inference_backends.py
+
+import numpy as np
+
+# O TensorFlow só é importado pelo backend que precisa dele: com um runtime
+# TFLite instalado (ai-edge-litert ou tflite-runtime) o worker não o carrega
+
+def tflite_interpreter_class():
+    """Interpreter do runtime TFLite mais leve instalado (ai-edge-litert, tflite-runtime ou o do TensorFlow)."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+class KerasBackend:
+    """Executa o modelo .h5 pelo runtime completo do tf.keras."""
+
+    name = 'keras'
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+
+        self.model = tf.keras.models.load_model(model_path)
+        # Como os lotes têm sempre o mesmo tamanho, o grafo é traçado uma única vez
+        self._inference_fn = tf.function(lambda batch: self.model(batch, training=False))
+
+    def predict_batch(self, batch):
+        """Recebe um lote float32 (B, 48, 48, 1) normalizado e retorna as confianças (B, 7)."""
+        return self._inference_fn(batch).numpy()
+
+class TFLiteBackend:
+    """
+    Executa um modelo convertido para TFLite (float ou quantizado em int8).
+    A entrada do interpretador é redimensionada para o tamanho do lote, e a
+    quantização da entrada/saída é aplicada quando o modelo for int8.
+    """
+
+    name = 'tflite'
+
+    def __init__(self, model_path, num_threads=None):
+        self.interpreter = tflite_interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.batch_size = None
+
+    def _resize(self, batch_size):
+        if batch_size == self.batch_size:
+            return
+        self.interpreter.resize_tensor_input(self.input_details['index'], [batch_size, *self.input_details['shape'][1:]])
+        self.interpreter.allocate_tensors()
+        # Os detalhes mudam depois do allocate_tensors (shape e, em alguns casos, índices)
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self.batch_size = batch_size
+
+    def predict_batch(self, batch):
+        """Recebe um lote float32 (B, 48, 48, 1) normalizado e retorna as confianças (B, 7)."""
+        self._resize(len(batch))
+
+        input_dtype = self.input_details['dtype']
+        if input_dtype != np.float32:
+            scale, zero_point = self.input_details['quantization']
+            batch = np.clip(np.round(batch / scale + zero_point), np.iinfo(input_dtype).min, np.iinfo(input_dtype).max)
+        self.interpreter.set_tensor(self.input_details['index'], batch.astype(input_dtype))
+        self.interpreter.invoke()
+
+        output = self.interpreter.get_tensor(self.output_details['index'])
+        if output.dtype != np.float32:
+            scale, zero_point = self.output_details['quantization']
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+def create_backend(backend_name, model_path, num_threads=None):
+    """Instancia o backend de inferência configurado em MODEL_BACKEND."""
+    if backend_name == 'keras':
+        return KerasBackend(model_path)
+    if backend_name in ('tflite', 'tflite_int8'):
+        return TFLiteBackend(model_path, num_threads)
+    raise ValueError(f"Backend de inferência desconhecido: {backend_name}")
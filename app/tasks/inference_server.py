@@ -0,0 +1,204 @@
+# app/tasks/inference_server.py
+
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+import numpy as np
+
+# Protocolo (Unix socket, big-endian):
+#   requisição: uint32 N + N frames float32 (48, 48, 1) normalizados
+#   resposta:   uint32 N + uint32 C + N x C confianças float32 (N = 0 indica erro)
+REQUEST_HEADER = struct.Struct('!I')
+RESPONSE_HEADER = struct.Struct('!II')
+FRAME_SHAPE = (48, 48, 1)
+FRAME_BYTES = int(np.prod(FRAME_SHAPE)) * 4
+
+def recv_exact(sock, size):
+    """Lê exatamente 'size' bytes do socket (ou levanta ConnectionError)."""
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("Conexão encerrada pelo outro lado.")
+        received += n
+    return bytes(data)
+
+# Menor lote executado pelo servidor; os demais tamanhos são potências de 2 até o max_batch
+MIN_BUCKET_SIZE = 8
+
+def bucket_sizes(max_batch):
+    """Tamanhos de lote usados pelo servidor (poucos shapes: o Keras traça o grafo uma vez por shape)."""
+    sizes = []
+    size = MIN_BUCKET_SIZE
+    while size < max_batch:
+        sizes.append(size)
+        size *= 2
+    sizes.append(max_batch)
+    return sizes
+
+class PendingRequest:
+    """Frames de uma chamada aguardando o lote dinâmico."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+class DynamicBatcher(threading.Thread):
+    """
+    Junta os frames de todas as tarefas conectadas em lotes dinâmicos: o lote
+    é executado quando atinge 'max_batch' frames ou quando o primeiro pedido
+    espera mais que 'max_wait_ms'. Cada lote é completado com zeros só até o
+    menor tamanho de bucket_sizes() que o comporta.
+    """
+
+    def __init__(self, backend, max_batch, max_wait_ms):
+        super().__init__(name='dynamic-batcher', daemon=True)
+        self.backend = backend
+        self.max_batch = max_batch
+        self.buckets = {size: np.zeros((size, *FRAME_SHAPE), dtype=np.float32) for size in bucket_sizes(max_batch)}
+        self.max_wait = max_wait_ms / 1000.0
+        self.pending = queue.Queue()
+
+    def submit(self, frames):
+        request = PendingRequest(frames)
+        self.pending.put(request)
+        request.done.wait()
+        if request.error:
+            raise request.error
+        return request.result
+
+    def run(self):
+        while True:
+            requests = [self.pending.get()]
+            total = len(requests[0].frames)
+            deadline = time.monotonic() + self.max_wait
+
+            while total < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                requests.append(request)
+                total += len(request.frames)
+
+            self._execute(requests)
+
+    def _execute(self, requests):
+        try:
+            frames = np.concatenate([request.frames for request in requests])
+            outputs = []
+            for start in range(0, len(frames), self.max_batch):
+                chunk = frames[start:start + self.max_batch]
+                # Poucos shapes fixos para o backend, com o mínimo de preenchimento
+                batch = self.buckets[min(size for size in self.buckets if size >= len(chunk))]
+                batch[len(chunk):] = 0.0
+                batch[:len(chunk)] = chunk
+                outputs.append(self.backend.predict_batch(batch)[:len(chunk)])
+            predictions = np.concatenate(outputs)
+
+            offset = 0
+            for request in requests:
+                request.result = predictions[offset:offset + len(request.frames)]
+                offset += len(request.frames)
+        except Exception as e:
+            for request in requests:
+                request.error = e
+        finally:
+            for request in requests:
+                request.done.set()
+
+class InferenceRequestHandler(socketserver.BaseRequestHandler):
+    """Atende uma conexão (um processo do worker) até ela ser encerrada."""
+
+    def handle(self):
+        while True:
+            try:
+                (count,) = REQUEST_HEADER.unpack(recv_exact(self.request, REQUEST_HEADER.size))
+                payload = recv_exact(self.request, count * FRAME_BYTES)
+            except ConnectionError:
+                return
+
+            frames = np.frombuffer(payload, dtype=np.float32).reshape((count, *FRAME_SHAPE))
+            try:
+                predictions = self.server.batcher.submit(frames).astype(np.float32)
+                header = RESPONSE_HEADER.pack(*predictions.shape)
+                self.request.sendall(header + predictions.tobytes())
+            except Exception as e:
+                print(f"Erro na inferência do lote dinâmico: {e}")
+                self.request.sendall(RESPONSE_HEADER.pack(0, 0))
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor local (um por nó) que mantém uma única cópia do modelo."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, backend, max_batch, max_wait_ms):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        os.makedirs(os.path.dirname(socket_path) or '.', exist_ok=True)
+        super().__init__(socket_path, InferenceRequestHandler)
+        self.batcher = DynamicBatcher(backend, max_batch, max_wait_ms)
+        self.batcher.start()
+
+class InferenceClient:
+    """
+    Cliente usado pelas tarefas quando INFERENCE_SERVER_SOCKET está configurado.
+    Tem a mesma interface dos backends locais (predict_batch).
+    """
+
+    name = 'inference_server'
+
+    def __init__(self, socket_path, timeout=30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.sock = None
+        self.pid = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+        self.pid = os.getpid()
+        return self
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+    def predict_batch(self, batch):
+        """Envia o lote ao servidor; reconecta uma vez se a conexão tiver caído."""
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        with self._lock:
+            try:
+                return self._request(batch)
+            except (ConnectionError, OSError):
+                self.close()
+                self.connect()
+                return self._request(batch)
+
+    def _request(self, batch):
+        if self.sock is not None and self.pid != os.getpid():
+            # Conexão herdada num fork: cada processo precisa da sua
+            self.close()
+        if self.sock is None:
+            self.connect()
+        self.sock.sendall(REQUEST_HEADER.pack(len(batch)) + batch.tobytes())
+        count, classes = RESPONSE_HEADER.unpack(recv_exact(self.sock, RESPONSE_HEADER.size))
+        if count == 0:
+            raise RuntimeError("O servidor de inferência não conseguiu processar o lote.")
+        payload = recv_exact(self.sock, count * classes * 4)
+        return np.frombuffer(payload, dtype=np.float32).reshape((count, classes))
@@ -0,0 +1,94 @@
+# app/tasks/model_conversion.py
+
+import time
+import cv2
+import numpy as np
+import tensorflow as tf
+from flask import current_app
+from .face_detection import FaceLocator
+from .frame_pipeline import FrameProducer
+from .inference_backends import KerasBackend, TFLiteBackend
+
+def load_frame_set(path, target_fps=4, limit=500):
+    """
+    Carrega o conjunto fixo de frames (uint8 (N, 48, 48, 1)) usado na calibração
+    e na comparação: um arquivo .npy salvo anteriormente ou um vídeo, que é
+    amostrado pelo mesmo pipeline da tarefa (inclusive a localização de rostos
+    da configuração, para que os frames sejam os mesmos da produção).
+    """
+    if path.endswith('.npy'):
+        return np.load(path)[:limit]
+
+    producer = FrameProducer(
+        cv2.VideoCapture(path), target_fps, batch_size=32, queue_size=4,
+        face_locator=FaceLocator.from_config(current_app.config)
+    )
+    producer.start()
+    buffers = [frames_batch for frames_batch, _ in producer.batches()]
+    producer.join()
+    if not buffers:
+        raise ValueError(f"Nenhum frame extraído de: {path}")
+    return np.concatenate(buffers)[:limit]
+
+def convert_to_tflite(keras_model_path, output_path, quantization=None, calibration_frames=None):
+    """
+    Converte o modelo .h5 para TFLite.
+    - quantization=None: modelo float32.
+    - quantization='int8': quantização inteira completa (pesos, ativações, entrada e
+      saída), calibrada com 'calibration_frames'.
+    """
+    model = tf.keras.models.load_model(keras_model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantization == 'int8':
+        if calibration_frames is None or len(calibration_frames) == 0:
+            raise ValueError("A quantização int8 exige frames de calibração.")
+
+        def representative_dataset():
+            for frame in calibration_frames:
+                yield [frame[np.newaxis].astype(np.float32) / 255.0]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    elif quantization is not None:
+        raise ValueError(f"Quantização desconhecida: {quantization}")
+
+    tflite_model = converter.convert()
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+    return output_path
+
+def run_backend(backend, frames, batch_size):
+    """Executa o backend sobre todos os frames; retorna (confianças (N, 7), ms por frame)."""
+    outputs = []
+    batch = np.zeros((batch_size, *frames.shape[1:]), dtype=np.float32)
+    started = time.perf_counter()
+    for start in range(0, len(frames), batch_size):
+        chunk = frames[start:start + batch_size]
+        batch[len(chunk):] = 0.0
+        np.divide(chunk, 255.0, out=batch[:len(chunk)], dtype=np.float32)
+        outputs.append(backend.predict_batch(batch)[:len(chunk)])
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    return np.concatenate(outputs), elapsed_ms / max(len(frames), 1)
+
+def compare_backends(keras_model_path, tflite_model_path, frames, batch_size=32):
+    """
+    Compara um modelo TFLite com o modelo Keras de referência no mesmo conjunto de frames.
+    Retorna a concordância da emoção principal (top-1), o erro absoluto das
+    confianças e a latência média por frame de cada backend.
+    """
+    reference, reference_ms = run_backend(KerasBackend(keras_model_path), frames, batch_size)
+    candidate, candidate_ms = run_backend(TFLiteBackend(tflite_model_path), frames, batch_size)
+
+    abs_error = np.abs(reference - candidate)
+    return {
+        'frames': int(len(frames)),
+        'top1_agreement': float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1))),
+        'mean_abs_error': float(abs_error.mean()),
+        'max_abs_error': float(abs_error.max()),
+        'keras_ms_per_frame': reference_ms,
+        'tflite_ms_per_frame': candidate_ms,
+    }
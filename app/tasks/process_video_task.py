@@ -4,40 +4,106 @@ import os
 import cv2
 import tempfile
 import shutil
+import time
+from contextlib import nullcontext
 import numpy as np
-import tensorflow as tf
 from celery import shared_task
 from flask import current_app
 from flask_socketio import SocketIO
 from app import services
+from app.metrics import FRAMES_ANALYZED, FRAMES_PER_SECOND, MODEL_LOAD_SECONDS, observe_stage, stage_timer
+from app.models import VideoStatus
+from app.realtime import ProgressEmitter
+from app.task_interface import EMOTION_LABELS, MODEL_CONFIG, PROCESS_VIDEO_TASK
+from .adaptive_sampling import select_adaptive_frames
+from .face_detection import FaceLocator
+from .frame_pipeline import FRAME_SIZE, FrameProducer, sample_grid_index
+from .inference_backends import create_backend
+from .inference_server import InferenceClient
+from .profiling import TaskProfiler, should_profile
+from .result_cache import build_cache_key, compute_file_hash
+from .streaming_ingest import STREAMING_CONCURRENCY, STREAMING_PART_SIZE, StreamingDownload, find_moov_placement
 
 # Configuração do SocketIO para o worker Celery
 socketio_celery = SocketIO(message_queue=os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0"))
 
 # --- CONFIGURAÇÕES GLOBAIS DA TAREFA ---
+# Taxa de amostragem padrão (TARGET_FPS na config; pode ser sobrescrita por requisição)
 TARGET_FPS = 24
+# Limite do modo em memória (MAX_VIDEO_DURATION_SECONDS na config)
 MAX_VIDEO_DURATION_SECONDS = 30
+# Frames gravados por transação no modo em blocos (CHUNK_SIZE na config)
+CHUNK_SIZE = 240
+# Tamanho fixo dos lotes enviados ao modelo (pode ser sobrescrito por INFERENCE_BATCH_SIZE na config)
+INFERENCE_BATCH_SIZE = 32
+# Amostragem adaptativa: passada grossa em ADAPTIVE_COARSE_FPS e bisseção onde a
+# distribuição de confianças muda mais que ADAPTIVE_CHANGE_THRESHOLD (0 a 1)
+ADAPTIVE_COARSE_FPS = 4
+ADAPTIVE_CHANGE_THRESHOLD = 0.1
+# Quantidade máxima de lotes decodificados aguardando a inferência (FRAME_QUEUE_SIZE na config)
+FRAME_QUEUE_SIZE = 4
 
-# --- CONFIGURAÇÃO DO NOVO MODELO ÚNICO ---
-# Aponta para o seu novo modelo único
-MODEL_CONFIG = {
-    's3_key': 'models/modelo_emocoes.h5',
-    'local_path': 'models/modelo_emocoes.h5'
-}
-# A ordem dos rótulos foi ajustada para corresponder EXATAMENTE à saída do modelo
-EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprised']
 loaded_model = None
-
-def load_model():
-    """Carrega o modelo de IA único, fazendo o download se necessário."""
-    global loaded_model
-    if loaded_model:
+# Com o servidor de inferência indisponível, o processo usa o modelo local e volta a
+# tentar o socket a partir de server_retry_at (espera dobrando até INFERENCE_SERVER_RETRY_MAX_SECONDS)
+server_retry_at = None
+server_retry_delay = None
+
+def schedule_server_retry():
+    """Agenda a próxima tentativa de voltar ao servidor de inferência."""
+    global server_retry_at, server_retry_delay
+    initial = current_app.config.get('INFERENCE_SERVER_RETRY_SECONDS', 30.0)
+    maximum = current_app.config.get('INFERENCE_SERVER_RETRY_MAX_SECONDS', 600.0)
+    server_retry_delay = min(server_retry_delay * 2, maximum) if server_retry_delay else initial
+    server_retry_at = time.monotonic() + server_retry_delay
+    print(f"Nova tentativa de usar o servidor de inferência em {server_retry_delay:.0f}s.")
+
+def load_model(local_only=False):
+    """
+    Carrega o modelo de IA único no backend configurado (MODEL_CONFIG['backend']),
+    fazendo o download se necessário.
+    Com INFERENCE_SERVER_SOCKET configurado, retorna um cliente do servidor de
+    inferência do nó e só carrega o modelo no processo se o servidor estiver
+    indisponível (ou com local_only=True, usado pelo próprio servidor e quando
+    o servidor falha no meio de uma tarefa). Nesses casos o modelo local é
+    temporário: as tarefas seguintes voltam a tentar o servidor, com espera
+    crescente entre as tentativas.
+    """
+    global loaded_model, server_retry_at, server_retry_delay
+    socket_path = current_app.config.get('INFERENCE_SERVER_SOCKET')
+    use_server = bool(socket_path) and not local_only
+
+    if isinstance(loaded_model, InferenceClient):
+        if use_server:
+            return loaded_model
+        # O servidor falhou no meio da tarefa: troca o cliente pelo modelo local
+        loaded_model.close()
+        loaded_model = None
+        schedule_server_retry()
+    elif loaded_model and not (use_server and (server_retry_at is None or time.monotonic() >= server_retry_at)):
         return loaded_model
 
-    print("Iniciando o carregamento do modelo de IA...")
+    if use_server:
+        try:
+            client = InferenceClient(socket_path, current_app.config.get('INFERENCE_SERVER_TIMEOUT', 30.0)).connect()
+            print(f"Usando o servidor de inferência em: {socket_path}")
+            # O modelo local (se havia um) é descartado
+            loaded_model = client
+            server_retry_at = server_retry_delay = None
+            return loaded_model
+        except OSError as e:
+            print(f"Servidor de inferência indisponível em {socket_path} ({e}). Usando o modelo no processo.")
+            schedule_server_retry()
+            if loaded_model:
+                return loaded_model
+
+    backend_name = MODEL_CONFIG['backend']
+    print(f"Iniciando o carregamento do modelo de IA (backend: {backend_name})...")
+    started = time.perf_counter()
     try:
-        local_path = MODEL_CONFIG['local_path']
-        s3_key = MODEL_CONFIG['s3_key']
+        model_files = MODEL_CONFIG if backend_name == 'keras' else MODEL_CONFIG[backend_name]
+        local_path = model_files['local_path']
+        s3_key = model_files['s3_key']
 
         os.makedirs(os.path.dirname(local_path), exist_ok=True)
 
@@ -48,46 +114,265 @@ def load_model():
         if not os.path.exists(local_path):
             raise FileNotFoundError(f"Arquivo do modelo não encontrado em: {local_path}")
 
-        loaded_model = tf.keras.models.load_model(local_path)
+        loaded_model = create_backend(backend_name, local_path, MODEL_CONFIG['num_threads'])
+        MODEL_LOAD_SECONDS.labels(backend=backend_name).observe(time.perf_counter() - started)
         print("Modelo carregado com sucesso.")
         return loaded_model
     except Exception as e:
         print(f"ERRO CRÍTICO AO CARREGAR O MODELO: {e}")
         return None
 
-def predict_emotions(img_path, model_instance):
-    """Executa a predição em uma imagem e retorna o array de confianças."""
-    try:
-        img = tf.keras.preprocessing.image.load_img(img_path, target_size=(48, 48), color_mode="grayscale")
-        img_array = tf.keras.preprocessing.image.img_to_array(img) / 255.0
-        img_array = np.expand_dims(img_array, axis=0)
+def warm_up_model(model_instance, batch_size=INFERENCE_BATCH_SIZE):
+    """
+    Executa um lote fictício para forçar o traçado do grafo (Keras) ou a
+    alocação dos tensores (TFLite) antes da primeira tarefa real.
+    """
+    dummy_batch = np.zeros((batch_size, FRAME_SIZE, FRAME_SIZE, 1), dtype=np.uint8)
+    predict_emotions_batch(dummy_batch, model_instance, batch_size)
+    print(f"Modelo aquecido com um lote fictício de {batch_size} frames.")
+
+def predict_emotions(frame_array, model_instance):
+    """Executa a predição em um frame (48, 48, 1) uint8 e retorna o array de confianças."""
+    return predict_emotions_batch(frame_array[np.newaxis], model_instance, batch_size=1)[0]
+
+def predict_emotions_batch(frames_buffer, model_instance, batch_size=INFERENCE_BATCH_SIZE):
+    """
+    Executa a predição em lotes de tamanho fixo sobre um buffer uint8 (N, 48, 48, 1).
+    A normalização é feita uma vez por lote, de forma vetorizada. Para o
+    servidor de inferência o último lote vai sem o preenchimento com zeros.
+    Retorna uma lista alinhada com o buffer: o array de confianças de cada
+    frame, ou None para os frames cujo lote falhou no modelo local.
+    Se o servidor de inferência falhar, o lote é repetido no modelo local do
+    processo; se ele não puder ser carregado, a exceção encerra a tarefa.
+    """
+    if isinstance(model_instance, InferenceClient) and loaded_model and loaded_model is not model_instance:
+        # Um lote anterior já trocou o servidor pelo modelo local
+        model_instance = loaded_model
+
+    results = [None] * len(frames_buffer)
+    batch = np.zeros((batch_size, FRAME_SIZE, FRAME_SIZE, 1), dtype=np.float32)
+
+    for start in range(0, len(frames_buffer), batch_size):
+        chunk = frames_buffer[start:start + batch_size]
+        # O último lote é completado com zeros para manter o shape fixo
+        batch[len(chunk):] = 0.0
+        np.divide(chunk, 255.0, out=batch[:len(chunk)], dtype=np.float32)
+
+        predictions = None
+        while predictions is None:
+            try:
+                with stage_timer('inference_batch'):
+                    # O servidor junta os frames de várias tarefas: envia só os frames reais
+                    model_input = batch[:len(chunk)] if isinstance(model_instance, InferenceClient) else batch
+                    predictions = model_instance.predict_batch(model_input)
+            except Exception as e:
+                if not isinstance(model_instance, InferenceClient):
+                    print(f"Erro ao predizer emoções para o lote iniciado no frame {start}: {e}")
+                    break
+                print(f"Servidor de inferência falhou no lote iniciado no frame {start} ({e}). Usando o modelo local.")
+                model_instance = load_model(local_only=True)
+                if not model_instance:
+                    raise RuntimeError("Servidor de inferência falhou e o modelo local não pôde ser carregado.") from e
+        if predictions is None:
+            continue
+
+        for i in range(len(chunk)):
+            # Ex: [0.1, 0.02, 0.05, 0.7, 0.03, 0.08, 0.02]
+            results[start + i] = predictions[i]
+
+    return results
+
+def sampling_settings(config, target_fps, sampling_mode):
+    """Configurações que alteram o resultado da análise (entram na chave do cache)."""
+    settings = {
+        'target_fps': float(target_fps),
+        'sampling_mode': sampling_mode,
+        'face_detection': config.get('FACE_DETECTION_ENABLED', False),
+        'dedup_threshold': config.get('DEDUP_THRESHOLD', 0.0),
+    }
+    if settings['face_detection']:
+        settings['face_detector'] = config.get('FACE_DETECTOR', 'haar')
+        settings['face_detection_interval'] = config.get('FACE_DETECTION_INTERVAL', 10)
+    if sampling_mode == 'adaptive':
+        settings['adaptive_coarse_fps'] = config.get('ADAPTIVE_COARSE_FPS', ADAPTIVE_COARSE_FPS)
+        settings['adaptive_change_threshold'] = config.get('ADAPTIVE_CHANGE_THRESHOLD', ADAPTIVE_CHANGE_THRESHOLD)
+    return settings
+
+def build_frame_result(frame_info, confidences, carried_forward=False):
+    """Monta o dicionário de um frame no formato esperado por save_analysis_results."""
+    # Cria um dicionário mapeando cada emoção à sua confiança
+    emotion_data = dict(zip(EMOTION_LABELS, [float(c) for c in confidences]))
+    return {
+        'frame_number': frame_info['frame_number'],
+        'timestamp': frame_info['timestamp'],
+        'emotions': emotion_data, # Este é o dicionário que será salvo como JSON
+        'carried_forward': carried_forward
+    }
+
+def run_uniform_analysis(producer, model, batch_size, on_progress, on_chunk=None, chunk_size=0):
+    """
+    Consome os lotes do produtor e classifica todos os frames amostrados.
+    Com 'on_chunk', os resultados são entregues em blocos de pelo menos
+    'chunk_size' frames (on_chunk(resultados, frames amostrados até aqui)) e
+    não ficam acumulados em memória.
+    Retorna (resultados, frames amostrados, frames reaproveitados).
+    """
+    classified_results = []
+    sampled_frames = 0
+    carried_forward_frames = 0
+    last_confidences = None
+
+    for frames_batch, batch_frames in producer.batches():
+        batch_confidences = predict_emotions_batch(frames_batch, model, batch_size) if len(frames_batch) else []
+
+        for frame_info in batch_frames:
+            carried_forward = frame_info['slot'] is None
+            if carried_forward:
+                # Frame quase idêntico ao anterior: reaproveita as últimas confianças
+                confidences = last_confidences
+            else:
+                confidences = last_confidences = batch_confidences[frame_info['slot']]
+
+            # Sem confianças (o lote falhou) o frame não é gravado nem conta como reaproveitado
+            if confidences is not None:
+                classified_results.append(build_frame_result(frame_info, confidences, carried_forward))
+                carried_forward_frames += carried_forward
+        sampled_frames += len(batch_frames)
 
-        prediction = model_instance.predict(img_array)
+        if on_chunk and len(classified_results) >= chunk_size:
+            on_chunk(classified_results, sampled_frames)
+            classified_results = []
+        on_progress(sampled_frames)
 
-        # --- ADIÇÃO CRUCIAL PARA DEBUG ---
-        # Esta linha irá mostrar a saída bruta do modelo no log do seu worker.
-        print(f"DEBUG: Saída do Modelo para {os.path.basename(img_path)} -> {prediction[0]}")
-        # ------------------------------------
+    if on_chunk:
+        on_chunk(classified_results, sampled_frames)
+        classified_results = []
 
-        # Retorna o array de predições, ex: [0.1, 0.02, 0.05, 0.7, 0.03, 0.08, 0.02]
-        return prediction[0]
+    return classified_results, sampled_frames, carried_forward_frames
+
+def run_adaptive_analysis(producer, model, batch_size, coarse_stride, change_threshold, on_progress):
+    """
+    Decodifica os frames candidatos na taxa alvo e só envia ao modelo os
+    escolhidos pela bisseção (ver select_adaptive_frames).
+    Retorna (resultados, frames preditos, 0).
+    """
+    buffers = []
+    frames_info = []
+    for frames_batch, batch_frames in producer.batches():
+        # O produtor roda sem deduplicação neste modo: cada frame ocupa um slot
+        buffers.append(frames_batch)
+        frames_info.extend(batch_frames)
+        on_progress(len(frames_info))
+
+    if not frames_info:
+        return [], 0, 0
+
+    frames_buffer = np.concatenate(buffers)
+    predictions = select_adaptive_frames(
+        frames_buffer,
+        lambda frames: predict_emotions_batch(frames, model, batch_size),
+        coarse_stride,
+        change_threshold
+    )
+    classified_results = [build_frame_result(frames_info[index], predictions[index]) for index in sorted(predictions)]
+    print(f"Amostragem adaptativa: {len(predictions)} de {len(frames_info)} frames candidatos enviados ao modelo.")
+    return classified_results, len(classified_results), 0
+
+def save_task_profile(profiler, video_id):
+    """Finaliza o perfil da tarefa e o grava no armazenamento, ao lado do vídeo."""
+    profiler.stop()
+    try:
+        archive_path = profiler.archive()
+        with current_app.app_context():
+            video = services.get_video_by_id(video_id)
+            if not video:
+                return
+            profile_key = f"{os.path.splitext(video.s3_key)[0]}.profile.zip"
+            if services.upload_profile_to_storage(profile_key, archive_path):
+                services.set_video_profile_key(video_id, profile_key)
+                print(f"Perfil do processamento do vídeo {video_id} salvo em: {profile_key}")
     except Exception as e:
-        print(f"Erro ao predizer emoção para {img_path}: {e}")
+        print(f"Erro ao salvar o perfil do vídeo {video_id}: {e}")
+
+def start_streaming_download(s3_key, temp_dir, config):
+    """
+    Inicia o download em partes do vídeo para um FIFO lido pelo decodificador.
+    Retorna None (o chamador baixa o arquivo inteiro, como antes) se o vídeo
+    não puder ser lido por intervalos ou se não for um MP4/MOV com o moov no
+    início: com o moov no fim, o decodificador precisaria voltar no arquivo,
+    o que um FIFO não permite.
+    """
+    reader = services.open_video_range_reader(s3_key)
+    if not reader:
+        return None
+    size, read_range = reader
+    placement = find_moov_placement(read_range, size)
+    if placement != 'start':
+        reason = 'moov no fim do arquivo' if placement == 'end' else 'container não suportado'
+        print(f"Streaming desativado para {s3_key} ({reason}): baixando o vídeo inteiro.")
         return None
 
-@shared_task(bind=True, ignore_result=True)
-def process_video(self, video_id):
+    stream = StreamingDownload(
+        read_range, size, os.path.join(temp_dir, 'video.fifo'),
+        config.get('STREAMING_PART_SIZE', STREAMING_PART_SIZE),
+        config.get('STREAMING_CONCURRENCY', STREAMING_CONCURRENCY)
+    )
+    stream.start()
+    return stream
+
+def record_video_failure(video_id, progress=None):
+    """
+    Marca o vídeo como FAILED no MySQL e no hash de status do Redis (avisando
+    o dono via Socket.IO), para que GET /videos/<id>/status não fique preso
+    no último progresso.
+    """
+    video = services.update_video_status(video_id, 'FAILED')
+    if progress is None:
+        progress = ProgressEmitter(socketio_celery, video_id, video.user_id, status_store=services.record_video_status)
+    progress.finish('FAILED')
+
+# acks_late + reject_on_worker_lost: se o worker morrer, a tarefa volta para a fila
+# e, no modo em blocos, é retomada a partir do checkpoint
+@shared_task(name=PROCESS_VIDEO_TASK, bind=True, ignore_result=True, max_retries=3, default_retry_delay=30,
+             acks_late=True, reject_on_worker_lost=True)
+def process_video(self, video_id, target_fps=None, sampling_mode=None, profile=False):
     print(f"Iniciando processamento para o vídeo ID: {video_id}")
 
+    # Normalmente o modelo já foi carregado e aquecido no worker_process_init
     model = load_model()
     if not model:
-        print("Nenhum modelo de IA carregado. Abortando tarefa.")
+        if self.request.retries < self.max_retries:
+            # Falha do worker, não do vídeo: devolve a tarefa para a fila
+            print("Nenhum modelo de IA carregado. Reenfileirando a tarefa.")
+            raise self.retry()
+        print("Nenhum modelo de IA carregado após várias tentativas. Abortando tarefa.")
         with current_app.app_context():
-            services.update_video_status(video_id, 'FAILED')
+            record_video_failure(video_id)
         return
 
+    target_fps = target_fps or current_app.config.get('TARGET_FPS', TARGET_FPS)
+    sampling_mode = sampling_mode or current_app.config.get('SAMPLING_MODE', 'uniform')
+    # A bisseção adaptativa precisa de todos os frames candidatos em memória, então
+    # esse modo continua gravando os resultados de uma vez no final
+    chunked = current_app.config.get('CHUNKED_PROCESSING_ENABLED', True) and sampling_mode != 'adaptive'
+    # Parte da chave do cache de resultados (antes do ajuste da taxa ao FPS do vídeo)
+    cache_sampling = sampling_settings(current_app.config, target_fps, sampling_mode)
+
     temp_dir = tempfile.mkdtemp()
     local_video_path = os.path.join(temp_dir, 'video.mp4')
+    progress = None
+    stream = None
+    cap = None
+
+    # Perfil sob demanda (profile=True) ou amostrado a cada PROFILING_SAMPLE_RATE tarefas;
+    # fora desses casos nenhum profiler é criado
+    profiler = None
+    if should_profile(profile, current_app.config.get('PROFILING_SAMPLE_RATE', 0)):
+        # O trace do TensorFlow só registra o Keras executado neste processo (nem o TFLite nem o servidor de inferência)
+        tf_trace = current_app.config.get('PROFILING_TF_TRACE', True) and MODEL_CONFIG['backend'] == 'keras' \
+            and not isinstance(model, InferenceClient)
+        profiler = TaskProfiler(os.path.join(temp_dir, f"profile-{video_id}"), tf_trace)
+        profiler.start()
 
     try:
         with current_app.app_context():
@@ -95,78 +380,200 @@ def process_video(self, video_id):
             if not video:
                 print(f"Vídeo com ID {video_id} não encontrado.")
                 return
+            # Eventos vão apenas para a sala do dono do vídeo, agrupados por tempo/variação
+            progress = ProgressEmitter.from_config(
+                socketio_celery, video_id, video.user_id, current_app.config,
+                status_store=services.record_video_status
+            )
+            if video.status == VideoStatus.COMPLETED:
+                # Tarefa reentregue depois de já ter sido concluída
+                print(f"Vídeo {video_id} já processado. Nada a fazer.")
+                return
 
-            socketio_celery.emit('processing_update', {'video_id': video_id, 'status': 'PROCESSING', 'progress': 5})
-            services.update_video_status(video_id, 'PROCESSING')
+            checkpoint = services.get_processing_checkpoint(video_id) if chunked else None
 
-            if not services.download_video_from_s3(video.s3_key, local_video_path):
-                raise IOError(f"Falha ao baixar o vídeo: {video.s3_key}")
+            progress.update(5, stage='download')
+            services.update_video_status(video_id, 'PROCESSING')
 
-        # Extração de frames (lógica permanece a mesma)
-        cap = cv2.VideoCapture(local_video_path)
+            # Streaming: a decodificação começa enquanto o vídeo ainda está sendo baixado.
+            # A retomada de um checkpoint precisa de seek, então usa o arquivo completo.
+            streaming = current_app.config.get('STREAMING_INGEST_ENABLED', False) and not checkpoint
+            download_started = time.perf_counter()
+            with stage_timer('download'):
+                if streaming:
+                    stream = start_streaming_download(video.s3_key, temp_dir, current_app.config)
+                if not stream and not services.download_video_from_s3(video.s3_key, local_video_path):
+                    raise IOError(f"Falha ao baixar o vídeo: {video.s3_key}")
+
+            # Uploads repetidos do mesmo arquivo reaproveitam a análise anterior (no streaming o
+            # hash só fica pronto no fim do download: o vídeo é gravado como fonte do cache, sem consulta)
+            if current_app.config.get('RESULT_CACHE_ENABLED', True) and not checkpoint and not stream:
+                with stage_timer('content_hash'):
+                    file_hash = compute_file_hash(local_video_path)
+                content_hash = build_cache_key(
+                    file_hash,
+                    f"{MODEL_CONFIG['version']}/{MODEL_CONFIG['backend']}",
+                    cache_sampling
+                )
+                services.set_video_content_hash(video_id, content_hash)
+
+                cached_video = services.find_cached_analysis(content_hash, video.user_id, exclude_video_id=video_id)
+                if cached_video:
+                    services.copy_analysis_results(cached_video, video_id)
+                    progress.finish('COMPLETED')
+                    print(f"Vídeo {video_id} idêntico ao vídeo {cached_video.id}: resultados reaproveitados do cache.")
+                    return
+
+        # Decodificação e inferência rodam em paralelo (produtor/consumidor)
+        cap = cv2.VideoCapture(stream.fifo_path if stream else local_video_path)
+        if stream and not cap.isOpened():
+            print(f"O decodificador não abriu o vídeo {video_id} em streaming: baixando o vídeo inteiro.")
+            cap.release()
+            stream.stop()
+            stream = None
+            with stage_timer('download'):
+                if not services.download_video_from_s3(video.s3_key, local_video_path):
+                    raise IOError(f"Falha ao baixar o vídeo: {video.s3_key}")
+            cap = cv2.VideoCapture(local_video_path)
         video_fps = cap.get(cv2.CAP_PROP_FPS)
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         duration = total_frames / video_fps if video_fps > 0 else 0
 
-        if duration > MAX_VIDEO_DURATION_SECONDS:
-            raise ValueError(f"Vídeo excede a duração máxima de {MAX_VIDEO_DURATION_SECONDS}s.")
-
-        extracted_frames = []
-        c_frame = 0
-        frame_interval = int(video_fps / TARGET_FPS) if video_fps > TARGET_FPS else 1
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret: break
-
-            if c_frame % frame_interval == 0:
-                frame_path = os.path.join(temp_dir, f"frame_{c_frame:04d}.jpg")
-                gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                cv2.imwrite(frame_path, gray_frame)
-                extracted_frames.append({
-                    'frame_number': c_frame,
-                    'path': frame_path,
-                    'timestamp': cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0,
-                })
-            c_frame += 1
-        cap.release()
-
-        # --- LÓGICA DE ANÁLISE SIMPLIFICADA ---
-        classified_results = []
-        total_frames_to_process = len(extracted_frames)
-
-        for i, frame_info in enumerate(extracted_frames):
-            confidences = predict_emotions(frame_info['path'], model)
-
-            if confidences is not None:
-                # Cria um dicionário mapeando cada emoção à sua confiança
-                emotion_data = dict(zip(EMOTION_LABELS, [float(c) for c in confidences]))
-                classified_results.append({
-                    'frame_number': frame_info['frame_number'],
-                    'timestamp': frame_info['timestamp'],
-                    'emotions': emotion_data # Este é o dicionário que será salvo como JSON
-                })
-
-            # Emite o progresso para o frontend
-            progress = 5 + int(((i + 1) / total_frames_to_process) * 90)
-            socketio_celery.emit('processing_update', {'video_id': video_id, 'status': 'PROCESSING', 'progress': progress})
+        # No modo em blocos a memória não cresce com a duração, então o limite é bem maior
+        if chunked:
+            max_duration = current_app.config.get('CHUNKED_MAX_VIDEO_DURATION_SECONDS', 0)
+        else:
+            max_duration = current_app.config.get('MAX_VIDEO_DURATION_SECONDS', MAX_VIDEO_DURATION_SECONDS)
+        if max_duration and duration > max_duration:
+            cap.release()
+            raise ValueError(f"Vídeo excede a duração máxima de {max_duration:g}s.")
+
+        if video_fps > 0:
+            target_fps = min(target_fps, video_fps)
+
+        # Vídeos longos podem ser divididos em trechos processados em paralelo (chord)
+        from .segment_tasks import dispatch_segments, plan_segments
+        # Um processamento em blocos interrompido é retomado no mesmo worker
+        segments = None if checkpoint else plan_segments(current_app.config, duration, target_fps, sampling_mode)
+        if segments:
+            cap.release()
+            progress.update(10, stage='segments')
+            dispatch_segments(video_id, segments, target_fps, duration)
+            return
+
+        expected_frames = max(int(duration * target_fps) + 1, 1)
+        batch_size = current_app.config.get('INFERENCE_BATCH_SIZE', INFERENCE_BATCH_SIZE)
+        queue_size = current_app.config.get('FRAME_QUEUE_SIZE', FRAME_QUEUE_SIZE)
+
+        face_locator = FaceLocator.from_config(current_app.config)
+
+        adaptive = sampling_mode == 'adaptive'
+        # A bisseção compara predições vizinhas; a deduplicação não se aplica a esse modo
+        dedup_threshold = 0.0 if adaptive else current_app.config.get('DEDUP_THRESHOLD', 0.0)
+
+        start_index = 0
+        base_sampled_frames = 0
+        if checkpoint:
+            # Retoma no primeiro instante de amostragem depois do último frame gravado
+            start_index = sample_grid_index(checkpoint['timestamp'] * 1000.0, 1000.0 / target_fps) + 1
+            base_sampled_frames = checkpoint['sampled_frames']
+            print(f"Retomando o vídeo {video_id} após o frame {checkpoint['frame_number']}.")
+
+        producer = FrameProducer(cap, target_fps, batch_size, queue_size, face_locator, dedup_threshold,
+                                 start_index=start_index)
+        if profiler:
+            profiler.profile_thread(producer)
+        producer.start()
+
+        def persist_chunk(frames, sampled_frames):
+            with current_app.app_context():
+                services.append_frame_results(video_id, frames, base_sampled_frames + sampled_frames)
+
+        def emit_progress(sampled_frames):
+            # O total de frames é uma estimativa do container
+            progress.update(5 + int(min((base_sampled_frames + sampled_frames) / expected_frames, 1.0) * 90), stage='analysis')
+
+        # --- ANÁLISE EM LOTES ---
+        analysis_started = time.perf_counter()
+        with stage_timer('analysis'), (profiler.inference_trace() if profiler else nullcontext()):
+            try:
+                if adaptive:
+                    coarse_fps = min(current_app.config.get('ADAPTIVE_COARSE_FPS', ADAPTIVE_COARSE_FPS), target_fps)
+                    classified_results, total_frames_to_process, carried_forward_frames = run_adaptive_analysis(
+                        producer, model, batch_size,
+                        coarse_stride=round(target_fps / coarse_fps),
+                        change_threshold=current_app.config.get('ADAPTIVE_CHANGE_THRESHOLD', ADAPTIVE_CHANGE_THRESHOLD),
+                        on_progress=emit_progress
+                    )
+                elif chunked:
+                    classified_results, total_frames_to_process, carried_forward_frames = run_uniform_analysis(
+                        producer, model, batch_size, on_progress=emit_progress,
+                        on_chunk=persist_chunk, chunk_size=current_app.config.get('CHUNK_SIZE', CHUNK_SIZE)
+                    )
+                else:
+                    classified_results, total_frames_to_process, carried_forward_frames = run_uniform_analysis(
+                        producer, model, batch_size, on_progress=emit_progress
+                    )
+            finally:
+                producer.stop()
+                producer.join()
+                observe_stage('decode', producer.decode_seconds)
+                observe_stage('preprocess', producer.preprocess_seconds)
+                if producer.first_frame_at:
+                    observe_stage('time_to_first_frame', producer.first_frame_at - download_started)
+
+        analysis_seconds = time.perf_counter() - analysis_started
+        FRAMES_ANALYZED.inc(total_frames_to_process)
+        if analysis_seconds > 0:
+            FRAMES_PER_SECOND.observe(total_frames_to_process / analysis_seconds)
+
+        if stream:
+            # Uma falha no meio do download fecha o FIFO e o decodificador vê um fim de arquivo
+            stream.join()
+            if stream.error or not stream.completed:
+                raise IOError(f"Falha no download em streaming do vídeo: {stream.error}")
+            if current_app.config.get('RESULT_CACHE_ENABLED', True):
+                with current_app.app_context():
+                    services.set_video_content_hash(video_id, build_cache_key(
+                        stream.file_hash,
+                        f"{MODEL_CONFIG['version']}/{MODEL_CONFIG['backend']}",
+                        cache_sampling
+                    ))
+
+        skip_ratio = carried_forward_frames / total_frames_to_process if total_frames_to_process else 0.0
+        print(f"Vídeo {video_id}: {carried_forward_frames}/{total_frames_to_process} frames reaproveitados (skip ratio {skip_ratio:.2%}).")
 
         with current_app.app_context():
+            progress.update(95, stage='saving')
+            if chunked:
+                # Os frames já foram gravados bloco a bloco
+                services.finalize_chunked_analysis(video_id, duration)
+                progress.finish('COMPLETED')
+                print(f"Processamento em blocos para o vídeo ID: {video_id} concluído com sucesso.")
+                return
+
             analysis_data = {
                 'total_frames_analyzed': total_frames_to_process,
                 'duration_seconds': duration,
+                'skip_ratio': skip_ratio,
                 'frames': sorted(classified_results, key=lambda x: x['frame_number'])
             }
             services.save_analysis_results(video_id, analysis_data)
 
-        socketio_celery.emit('processing_update', {'video_id': video_id, 'status': 'COMPLETED', 'progress': 100})
+        progress.finish('COMPLETED')
         print(f"Processamento para o vídeo ID: {video_id} concluído com sucesso.")
 
     except Exception as e:
         print(f"ERRO ao processar vídeo {video_id}: {e}")
-        socketio_celery.emit('processing_update', {'video_id': video_id, 'status': 'FAILED', 'progress': 0})
         with current_app.app_context():
-            services.update_video_status(video_id, 'FAILED')
+            record_video_failure(video_id, progress)
     finally:
+        if stream:
+            # O decodificador fecha o FIFO primeiro, liberando uma escrita bloqueada
+            if cap is not None:
+                cap.release()
+            stream.stop()
+        if profiler:
+            save_task_profile(profiler, video_id)
         print(f"Limpando diretório temporário: {temp_dir}")
         shutil.rmtree(temp_dir)
\ No newline at end of file
@@ -0,0 +1,98 @@
+# app/tasks/profiling.py
+
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import shutil
+from contextlib import contextmanager
+
+# Contador de tarefas do processo (amostragem de 1 a cada PROFILING_SAMPLE_RATE tarefas)
+_task_counter = itertools.count(1)
+# Funções listadas no resumo em texto de cada perfil
+SUMMARY_LIMIT = 60
+
+def should_profile(requested, sample_rate):
+    """Decide uma única vez, no início da tarefa, se ela será perfilada."""
+    task_number = next(_task_counter)
+    return bool(requested) or (sample_rate > 0 and task_number % sample_rate == 0)
+
+class TaskProfiler:
+    """
+    Perfil de uma execução do process_video, criado apenas quando a tarefa é
+    perfilada (sem custo nenhum nas demais):
+
+    - cProfile da thread da tarefa e, com profile_thread(), da thread do
+      produtor de frames (decodificação e pré-processamento);
+    - com tf_trace, um trace do profiler do TensorFlow (tempo por op) durante
+      a inferência, visualizável no TensorBoard.
+
+    Tudo é gravado em 'output_dir' e compactado em um .zip por archive().
+    """
+
+    def __init__(self, output_dir, tf_trace=True):
+        self.output_dir = output_dir
+        self.tf_trace = tf_trace
+        self.profiles = {}
+        os.makedirs(output_dir, exist_ok=True)
+
+    def start(self):
+        self.profiles['task'] = cProfile.Profile()
+        self.profiles['task'].enable()
+
+    def stop(self):
+        self.profiles['task'].disable()
+
+    def profile_thread(self, thread):
+        """Envolve o run() de uma thread (ainda não iniciada) num cProfile próprio."""
+        profile = cProfile.Profile()
+        self.profiles[thread.name] = profile
+        original_run = thread.run
+
+        def profiled_run():
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+: o cProfile da tarefa já registra todas as threads
+                self.profiles.pop(thread.name, None)
+                return original_run()
+            try:
+                original_run()
+            finally:
+                profile.disable()
+
+        thread.run = profiled_run
+
+    @contextmanager
+    def inference_trace(self):
+        """Trace do TensorFlow em volta da inferência (ops do grafo Keras; o TFLite não aparece op a op)."""
+        if not self.tf_trace:
+            yield
+            return
+
+        import tensorflow as tf
+        try:
+            tf.profiler.experimental.start(os.path.join(self.output_dir, 'tensorflow'))
+        except Exception as e:
+            print(f"Não foi possível iniciar o profiler do TensorFlow: {e}")
+            yield
+            return
+        try:
+            yield
+        finally:
+            tf.profiler.experimental.stop()
+
+    def write_reports(self):
+        """Grava cada perfil em .prof (pstats/snakeviz) e um resumo em texto por tempo acumulado."""
+        for name, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+            summary = io.StringIO()
+            pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(SUMMARY_LIMIT)
+            with open(os.path.join(self.output_dir, f"{name}.txt"), 'w') as f:
+                f.write(summary.getvalue())
+
+    def archive(self):
+        """Grava os relatórios e compacta o diretório; retorna o caminho do .zip."""
+        self.write_reports()
+        return shutil.make_archive(self.output_dir, 'zip', self.output_dir)
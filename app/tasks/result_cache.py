@@ -0,0 +1,27 @@
+# app/tasks/result_cache.py
+
+import hashlib
+import json
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def compute_file_hash(file_path, chunk_size=HASH_CHUNK_SIZE):
+    """Calcula o SHA-256 do arquivo lendo em blocos (memória constante)."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_cache_key(file_hash, model_version, sampling_settings):
+    """
+    Combina o hash do conteúdo com a versão do modelo e as configurações de
+    amostragem: o mesmo arquivo processado com outro modelo ou outra taxa
+    de amostragem gera uma chave diferente.
+    """
+    payload = json.dumps({
+        'content': file_hash,
+        'model': model_version,
+        'sampling': sampling_settings,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
@@ -0,0 +1,138 @@
+# app/tasks/segment_tasks.py
+
+import os
+import math
+import shutil
+import tempfile
+import cv2
+from celery import chord, shared_task
+from flask import current_app
+from app import services
+from app.realtime import ProgressEmitter
+from .face_detection import FaceLocator, tracking_is_deterministic
+from .frame_pipeline import FrameProducer
+from .process_video_task import (
+    CHUNK_SIZE,
+    FRAME_QUEUE_SIZE,
+    INFERENCE_BATCH_SIZE,
+    load_model,
+    record_video_failure,
+    run_uniform_analysis,
+    socketio_celery,
+)
+
+def plan_segments(config, duration, target_fps, sampling_mode):
+    """
+    Divide o vídeo em trechos de índices da grade de amostragem [início, fim).
+    Retorna None quando o vídeo deve ser processado por uma única tarefa.
+
+    Os trechos começam em múltiplos de FACE_DETECTION_INTERVAL, para que cada
+    um comece num ciclo novo do detector de rostos. Como a localização entre
+    detecções é determinística (caixa reaproveitada ou KCF), o resultado
+    mesclado é idêntico ao processamento serial; com um tracker aleatório não
+    seria, e o fan-out não é usado. Pelo mesmo motivo ele também não é usado
+    na amostragem adaptativa (a bisseção é global) nem com deduplicação
+    (a referência do frame anterior atravessaria os trechos).
+    """
+    if not config.get('FANOUT_ENABLED', False):
+        return None
+    if sampling_mode == 'adaptive' or config.get('DEDUP_THRESHOLD', 0.0) > 0:
+        return None
+    face_detection = config.get('FACE_DETECTION_ENABLED', False)
+    if face_detection and not tracking_is_deterministic():
+        return None
+
+    total_indexes = int(duration * target_fps) + 1
+    max_segments = max(config.get('FANOUT_MAX_SEGMENTS', 8), 1)
+    segment_size = max(
+        math.ceil(config.get('FANOUT_SEGMENT_SECONDS', 10) * target_fps),
+        math.ceil(total_indexes / max_segments)
+    )
+    alignment = config.get('FACE_DETECTION_INTERVAL', 10) if face_detection else 1
+    segment_size = math.ceil(segment_size / alignment) * alignment
+
+    if segment_size >= total_indexes:
+        return None
+
+    starts = list(range(0, total_indexes, segment_size))
+    # O último trecho fica aberto: a duração do container é só uma estimativa
+    return [(start, start + segment_size if i < len(starts) - 1 else None) for i, start in enumerate(starts)]
+
+def dispatch_segments(video_id, segments, target_fps, duration):
+    """Dispara um chord: uma tarefa por trecho e a mesclagem como callback."""
+    header = [process_video_segment.s(video_id, start, end, target_fps) for start, end in segments]
+    callback = merge_video_segments.s(video_id, duration).on_error(mark_video_failed.si(video_id))
+    chord(header)(callback)
+    print(f"Vídeo {video_id} dividido em {len(segments)} trechos para processamento paralelo.")
+
+@shared_task(bind=True, ignore_result=False, acks_late=True)
+def process_video_segment(self, video_id, start_index, end_index, target_fps):
+    """Baixa o vídeo, decodifica e classifica apenas os frames do trecho."""
+    model = load_model()
+    if not model:
+        raise RuntimeError("Nenhum modelo de IA carregado.")
+
+    temp_dir = tempfile.mkdtemp()
+    local_video_path = os.path.join(temp_dir, 'video.mp4')
+    try:
+        video = services.get_video_by_id(video_id)
+        if not video:
+            raise services.VideoServiceError("Vídeo não encontrado.")
+        if not services.download_video_from_s3(video.s3_key, local_video_path):
+            raise IOError(f"Falha ao baixar o vídeo: {video.s3_key}")
+
+        batch_size = current_app.config.get('INFERENCE_BATCH_SIZE', INFERENCE_BATCH_SIZE)
+        producer = FrameProducer(
+            cv2.VideoCapture(local_video_path), target_fps, batch_size,
+            current_app.config.get('FRAME_QUEUE_SIZE', FRAME_QUEUE_SIZE),
+            FaceLocator.from_config(current_app.config),
+            start_index=start_index, end_index=end_index
+        )
+        producer.start()
+        try:
+            classified_results, sampled_frames, _ = run_uniform_analysis(
+                producer, model, batch_size, on_progress=lambda sampled: None
+            )
+        finally:
+            producer.stop()
+            producer.join()
+
+        print(f"Trecho [{start_index}, {end_index}) do vídeo {video_id}: {sampled_frames} frames.")
+        return {'frames': classified_results, 'sampled_frames': sampled_frames}
+    finally:
+        shutil.rmtree(temp_dir)
+
+@shared_task(ignore_result=True)
+def merge_video_segments(segment_results, video_id, duration):
+    """
+    Callback do chord: grava os trechos em ordem, em blocos de CHUNK_SIZE frames
+    com checkpoint (como o processamento em blocos), e conclui a análise.
+    Frames até o checkpoint já gravado são ignorados, então uma nova execução
+    do callback não duplica frames.
+    """
+    chunk_size = max(current_app.config.get('CHUNK_SIZE', CHUNK_SIZE), 1)
+    checkpoint = services.get_processing_checkpoint(video_id)
+    last_saved = checkpoint['frame_number'] if checkpoint else -1
+
+    sampled_before = 0
+    for segment in segment_results:
+        frames = sorted(segment.pop('frames'), key=lambda x: x['frame_number'])
+        for start in range(0, len(frames), chunk_size):
+            chunk = [frame for frame in frames[start:start + chunk_size] if frame['frame_number'] > last_saved]
+            if not chunk:
+                continue
+            # Frames amostrados até o fim do bloco (exato no último bloco de cada trecho)
+            last_chunk = start + chunk_size >= len(frames)
+            sampled = sampled_before + (segment['sampled_frames'] if last_chunk else start + len(chunk))
+            services.append_frame_results(video_id, chunk, sampled)
+        sampled_before += segment['sampled_frames']
+
+    video = services.finalize_chunked_analysis(video_id, duration)
+    ProgressEmitter(socketio_celery, video_id, video.user_id, status_store=services.record_video_status).finish('COMPLETED')
+    print(f"Processamento paralelo do vídeo ID: {video_id} concluído com sucesso.")
+
+@shared_task(ignore_result=True)
+def mark_video_failed(video_id):
+    """Errback do chord: algum trecho falhou."""
+    print(f"ERRO no processamento paralelo do vídeo {video_id}.")
+    record_video_failure(video_id)
@@ -0,0 +1,136 @@
+# app/tasks/streaming_ingest.py
+
+import errno
+import hashlib
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Tamanho de cada GET com Range e quantos ficam em andamento ao mesmo tempo
+# (STREAMING_PART_SIZE e STREAMING_CONCURRENCY na config)
+STREAMING_PART_SIZE = 8 * 1024 * 1024
+STREAMING_CONCURRENCY = 4
+# Quanto tempo esperar o decodificador abrir o FIFO antes de desistir
+FIFO_OPEN_TIMEOUT = 30.0
+# Caixas de topo do MP4/MOV inspecionadas à procura do moov
+MAX_HEADER_BOXES = 32
+
+def find_moov_placement(read_range, size):
+    """
+    Percorre as caixas de topo do ISO BMFF (MP4/MOV) lendo só os cabeçalhos.
+    Retorna 'start' se o moov (ou um MP4 fragmentado) vem antes dos dados,
+    'end' se o mdat vem primeiro (o decodificador precisaria voltar no
+    arquivo) e None se não for um MP4/MOV reconhecível.
+    """
+    offset = 0
+    for _ in range(MAX_HEADER_BOXES):
+        if offset + 8 > size:
+            return None
+        header = read_range(offset, min(offset + 16, size))
+        box_size, box_type = struct.unpack('>I4s', header[:8])
+        if box_size == 1:
+            if len(header) < 16:
+                return None
+            box_size = struct.unpack('>Q', header[8:16])[0]
+        elif box_size == 0:
+            box_size = size - offset
+
+        if offset == 0 and box_type != b'ftyp':
+            return None
+        if box_type in (b'moov', b'moof'):
+            return 'start'
+        if box_type == b'mdat':
+            return 'end'
+        if box_size < 8:
+            return None
+        offset += box_size
+    return None
+
+class StreamingDownload(threading.Thread):
+    """
+    Baixa o vídeo em partes (GETs com Range, até 'concurrency' em paralelo e
+    entregues em ordem) e repassa os bytes ao decodificador por um FIFO, para que
+    a extração de frames comece assim que o cabeçalho do container chega.
+
+    Os bytes também entram num SHA-256 incremental (o mesmo do compute_file_hash),
+    usado no cache de resultados. Se o decodificador fechar o FIFO antes do fim
+    (ex: bytes finais sem frames), o download continua só para completar o hash.
+    """
+
+    def __init__(self, read_range, size, fifo_path, part_size=STREAMING_PART_SIZE,
+                 concurrency=STREAMING_CONCURRENCY):
+        super().__init__(name='streaming-download', daemon=True)
+        self.read_range = read_range
+        self.size = size
+        self.fifo_path = fifo_path
+        self.part_size = part_size
+        self.concurrency = max(concurrency, 1)
+        self.error = None
+        self.completed = False
+        self.file_hash = None
+        self._digest = hashlib.sha256()
+        self._stop_event = threading.Event()
+        os.mkfifo(fifo_path)
+
+    def run(self):
+        fifo_fd = None
+        try:
+            fifo_fd = self._open_fifo()
+            parts = [(start, min(start + self.part_size, self.size)) for start in range(0, self.size, self.part_size)]
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='streaming-part') as executor:
+                # Janela deslizante: no máximo 'concurrency' partes em memória
+                pending = [executor.submit(self.read_range, *part) for part in parts[:self.concurrency]]
+                next_part = len(pending)
+                while pending and not self._stop_event.is_set():
+                    data = pending.pop(0).result()
+                    if next_part < len(parts):
+                        pending.append(executor.submit(self.read_range, *parts[next_part]))
+                        next_part += 1
+
+                    self._digest.update(data)
+                    if fifo_fd is not None:
+                        fifo_fd = self._write_fifo(fifo_fd, data)
+
+                for future in pending:
+                    future.cancel()
+            if not self._stop_event.is_set():
+                self.completed = True
+                self.file_hash = self._digest.hexdigest()
+        except Exception as e:
+            self.error = e
+        finally:
+            if fifo_fd is not None:
+                os.close(fifo_fd)
+
+    def _open_fifo(self):
+        """Abre o FIFO para escrita sem bloquear para sempre se o decodificador não abrir."""
+        deadline = time.monotonic() + FIFO_OPEN_TIMEOUT
+        while not self._stop_event.is_set():
+            try:
+                fd = os.open(self.fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+                os.set_blocking(fd, True)
+                return fd
+            except OSError as e:
+                # ENXIO: ainda não há leitor no FIFO
+                if e.errno != errno.ENXIO or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+        return None
+
+    def _write_fifo(self, fifo_fd, data):
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fifo_fd, view)
+                view = view[written:]
+            return fifo_fd
+        except BrokenPipeError:
+            # O decodificador terminou (ou parou): o restante só completa o hash
+            os.close(fifo_fd)
+            return None
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        self.join(timeout)
@@ -0,0 +1,58 @@
+# app/tasks/thread_tuning.py
+
+import os
+
+def available_cpus():
+    """CPUs que este processo pode usar (respeita cgroups/affinity quando disponível)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def derive_thread_settings(config, concurrency, cpus=None):
+    """
+    Calcula os tamanhos dos pools de threads de cada processo do worker.
+
+    Por padrão os CPUs são divididos entre os processos do Celery
+    (cpus // concurrency por processo), para evitar concurrency x cpus threads
+    disputando os mesmos núcleos. Valores > 0 na configuração têm prioridade:
+    - TF_INTRA_OP_THREADS: threads dentro de cada op do TensorFlow (e do TFLite);
+    - TF_INTER_OP_THREADS: ops do TensorFlow executadas em paralelo;
+    - OPENCV_THREADS: threads do OpenCV (decodificação, resize, conversão de cor).
+    """
+    cpus = cpus or available_cpus()
+    per_process = max(cpus // max(int(concurrency or cpus), 1), 1)
+    return {
+        'intra_op': config.get('TF_INTRA_OP_THREADS') or per_process,
+        # O modelo é sequencial: poucas ops independentes para rodar em paralelo
+        'inter_op': config.get('TF_INTER_OP_THREADS') or min(per_process, 2),
+        'opencv': config.get('OPENCV_THREADS') or per_process,
+    }
+
+def apply_thread_settings(settings, tensorflow=True):
+    """
+    Aplica os tamanhos dos pools no processo atual. Deve rodar antes do modelo
+    ser carregado: depois que o runtime do TensorFlow inicializa, os pools do
+    TF não podem mais ser alterados (o aviso é apenas registrado).
+    Os pools do TensorFlow só são configurados com o backend Keras e
+    tensorflow=True: o processo principal de um pool prefork não deve importar
+    o TensorFlow antes do fork, e os backends TFLite não precisam dele.
+    """
+    import cv2
+    from app.task_interface import MODEL_CONFIG
+
+    cv2.setNumThreads(settings['opencv'])
+    if tensorflow and MODEL_CONFIG['backend'] == 'keras':
+        import tensorflow as tf
+
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(settings['intra_op'])
+            tf.config.threading.set_inter_op_parallelism_threads(settings['inter_op'])
+        except RuntimeError as e:
+            print(f"Pools de threads do TensorFlow já inicializados neste processo: {e}")
+
+    # O interpretador TFLite recebe o número de threads na criação
+    if not os.getenv('TFLITE_NUM_THREADS'):
+        MODEL_CONFIG['num_threads'] = settings['intra_op']
+
+    print(f"Threads por processo: TF intra-op={settings['intra_op']}, inter-op={settings['inter_op']}, OpenCV={settings['opencv']}")
@@ -0,0 +1,151 @@
+# app/tasks/worker_hooks.py
+
+import os
+import signal
+from celery.signals import task_postrun, task_prerun, worker_init, worker_process_init, worker_process_shutdown
+from app.metrics import TASKS_TOTAL, mark_process_dead, observe_queue_wait, push_metrics, start_metrics_server
+from app.task_interface import MODEL_CONFIG
+from .thread_tuning import apply_thread_settings, derive_thread_settings
+
+# Backends cujo runtime pode ser inicializado antes do fork: o Keras cria os
+# pools de threads e o estado do runtime do TensorFlow, que não sobrevivem ao fork
+PRELOAD_BEFORE_FORK_BACKENDS = ('tflite', 'tflite_int8')
+
+def child_ready_file(ready_file, pid=None):
+    """Arquivo de prontidão de um processo filho (um por pid)."""
+    return f"{ready_file}.{pid or os.getpid()}"
+
+def reset_worker_ready(ready_file, expected_children):
+    """
+    Remove os arquivos de prontidão anteriores e grava em 'ready_file' quantos
+    filhos precisam ficar prontos. O healthcheck exige um arquivo por filho vivo.
+    """
+    if not ready_file:
+        return
+    directory, prefix = os.path.split(ready_file)
+    for name in os.listdir(directory or '.'):
+        if name.startswith(prefix + '.'):
+            os.remove(os.path.join(directory, name))
+    with open(ready_file, 'w') as f:
+        f.write(str(expected_children))
+
+def mark_worker_ready(ready_file, ready):
+    """Cria (ou remove) o arquivo de prontidão deste processo filho."""
+    if not ready_file:
+        return
+    child_file = child_ready_file(ready_file)
+    if ready:
+        with open(child_file, 'w') as f:
+            f.write(str(os.getpid()))
+    elif os.path.exists(child_file):
+        os.remove(child_file)
+
+def preload_model(flask_app, warm_up=True):
+    """Carrega (e opcionalmente aquece) o modelo dentro do contexto da aplicação."""
+    # Import tardio: só o processo do worker precisa do TensorFlow
+    from .process_video_task import INFERENCE_BATCH_SIZE, load_model, warm_up_model
+
+    with flask_app.app_context():
+        model = load_model()
+        if model and warm_up:
+            warm_up_model(model, flask_app.config.get('INFERENCE_BATCH_SIZE', INFERENCE_BATCH_SIZE))
+        return model
+
+def register_worker_hooks(flask_app):
+    """
+    Conecta os sinais do Celery que deixam o modelo pronto antes da primeira tarefa.
+
+    - MODEL_PRELOAD: cada processo filho carrega e aquece o modelo no
+      worker_process_init e cria o arquivo WORKER_READY_FILE.<pid>. O processo
+      principal grava em WORKER_READY_FILE a concorrência, e o healthcheck do
+      container só passa com um arquivo para cada filho vivo. Se a pré-carga
+      falhar em qualquer filho, o worker inteiro para de consumir (desligamento
+      suave do processo principal): as tarefas ainda não confirmadas voltam à
+      fila para um worker saudável em vez de gastar as novas tentativas aqui,
+      e o container é reiniciado pela política de restart.
+    - MODEL_PRELOAD_BEFORE_FORK: o processo principal carrega os pesos antes
+      do fork (pool prefork), e os filhos os compartilham por copy-on-write.
+      Só vale para os backends TFLite: com o Keras o runtime do TensorFlow
+      seria inicializado antes do fork, o que não é seguro, e a opção é ignorada.
+      O aquecimento continua sendo feito em cada filho. Com
+      INFERENCE_SERVER_SOCKET nada é carregado antes do fork: cada filho abre
+      a própria conexão com o servidor.
+
+    Os pools prefork e solo disparam o worker_process_init; com threads/gevent
+    o modelo continua sendo carregado na primeira tarefa.
+
+    Antes de qualquer carregamento, os pools de threads do TensorFlow e do
+    OpenCV são dimensionados a partir da concorrência do worker (ver
+    thread_tuning.derive_thread_settings). No prefork o processo principal
+    só ajusta o OpenCV e o TFLite; o TensorFlow é configurado (e importado)
+    apenas nos filhos.
+
+    Também registra as métricas das tarefas (tempo de fila e resultado) e as
+    expõe na porta WORKER_METRICS_PORT e/ou no Pushgateway METRICS_PUSHGATEWAY_URL.
+    """
+    config = flask_app.config
+    ready_file = config.get('WORKER_READY_FILE')
+    metrics_port = config.get('WORKER_METRICS_PORT')
+    pushgateway_url = config.get('METRICS_PUSHGATEWAY_URL')
+    # Calculados no processo principal e herdados pelos filhos no fork
+    thread_settings = {}
+    worker_state = {'main_pid': None}
+
+    @worker_init.connect(weak=False)
+    def load_model_before_fork(sender=None, **kwargs):
+        worker_state['main_pid'] = os.getpid()
+        # Só o prefork tem um processo filho por unidade de concorrência; o solo roda num único processo
+        prefork = getattr(getattr(sender, 'pool_cls', None), '__module__', '').endswith('prefork')
+        reset_worker_ready(ready_file, (getattr(sender, 'concurrency', None) or 1) if prefork else 1)
+        if metrics_port:
+            start_metrics_server(metrics_port)
+
+        thread_settings.update(derive_thread_settings(config, getattr(sender, 'concurrency', None)))
+        # No prefork os pools do TensorFlow ficam para cada filho (worker_process_init)
+        apply_thread_settings(thread_settings, tensorflow=not prefork)
+
+        if config.get('MODEL_PRELOAD') and config.get('MODEL_PRELOAD_BEFORE_FORK'):
+            if config.get('INFERENCE_SERVER_SOCKET'):
+                # Uma conexão aberta antes do fork seria compartilhada por todos os filhos
+                print("MODEL_PRELOAD_BEFORE_FORK ignorado: cada filho conecta ao servidor de inferência.")
+            elif MODEL_CONFIG['backend'] not in PRELOAD_BEFORE_FORK_BACKENDS:
+                print(f"MODEL_PRELOAD_BEFORE_FORK ignorado: não é seguro com o backend {MODEL_CONFIG['backend']}.")
+            else:
+                print("Carregando o modelo no processo principal antes do fork...")
+                preload_model(flask_app, warm_up=False)
+
+    @worker_process_init.connect(weak=False)
+    def load_model_in_child(**kwargs):
+        if thread_settings:
+            apply_thread_settings(thread_settings)
+
+        if not config.get('MODEL_PRELOAD'):
+            mark_worker_ready(ready_file, True)
+            return
+
+        try:
+            model = preload_model(flask_app)
+        except Exception as e:
+            print(f"ERRO ao pré-carregar o modelo no worker: {e}")
+            model = None
+        mark_worker_ready(ready_file, model is not None)
+
+        if model is None and worker_state['main_pid']:
+            # SIGTERM no processo principal (no pool solo, o próprio processo) = desligamento suave
+            print("Modelo indisponível neste processo: encerrando o worker para não consumir tarefas.")
+            os.kill(worker_state['main_pid'], signal.SIGTERM)
+
+    @task_prerun.connect(weak=False)
+    def record_queue_wait(task=None, **kwargs):
+        observe_queue_wait(task.name, getattr(task.request, 'enqueued_at', None))
+
+    @task_postrun.connect(weak=False)
+    def record_task_outcome(task=None, state=None, **kwargs):
+        TASKS_TOTAL.labels(task=task.name, outcome=state or 'UNKNOWN').inc()
+        if pushgateway_url:
+            push_metrics(pushgateway_url, job='deep_worker')
+
+    @worker_process_shutdown.connect(weak=False)
+    def release_process_metrics(pid=None, **kwargs):
+        mark_worker_ready(ready_file, False)
+        mark_process_dead(pid or os.getpid())
@@ -0,0 +1,10 @@
+# benchmarks/__init__.py
+"""
+Benchmarks reprodutíveis do pipeline de análise de vídeo.
+
+- synthetic_video: gera clipes sintéticos (resolução, FPS e duração variáveis).
+- stub_model: modelo falso com a mesma entrada/saída do modelo_emocoes.h5.
+- run: executa o process_video de ponta a ponta (armazenamento local + SQLite)
+  e grava as durações de cada etapa em JSON.
+- compare: compara um resultado com o baseline salvo e aponta regressões.
+"""
@@ -0,0 +1,108 @@
+# benchmarks/autotune.py
+
+import json
+import os
+import subprocess
+import sys
+import click
+
+from .synthetic_video import ensure_clip
+
+# Mistura de vídeos usada por padrão (parecida com os uploads reais: clipes curtos de celular)
+DEFAULT_MIX = ['1280x720@30:15', '1920x1080@30:15', '640x360@30:15']
+
+def default_layouts(cpus):
+    """Layouts (processos, threads por processo) que ocupam todos os CPUs: 1xN, 2xN/2, ..., Nx1."""
+    layouts = []
+    processes = 1
+    while processes <= cpus:
+        layouts.append((processes, max(cpus // processes, 1)))
+        processes *= 2
+    if layouts[-1][0] != cpus:
+        layouts.append((cpus, 1))
+    return layouts
+
+def parse_layout(raw):
+    processes, sep, threads = raw.lower().partition('x')
+    if not sep:
+        raise click.BadParameter(f"Use PROCESSOSxTHREADS: '{raw}'")
+    return int(processes), int(threads)
+
+def run_layout(processes, threads, clips, repeat, model, model_path, workdir):
+    """
+    Executa 'processes' benchmarks/run.py simultâneos (um por processo do worker
+    simulado), cada um com 'threads' threads de TF/OpenCV e banco SQLite próprio.
+    Retorna o throughput somado dos processos (frames por segundo).
+    """
+    layout_dir = os.path.join(workdir, f"layout_{processes}x{threads}")
+    os.makedirs(layout_dir, exist_ok=True)
+
+    running = []
+    for index in range(processes):
+        output = os.path.join(layout_dir, f"proc{index}.json")
+        command = [
+            sys.executable, '-m', 'benchmarks.run',
+            '--repeat', str(repeat), '--model', model, '--concurrency', str(processes),
+            '--set', f"TF_INTRA_OP_THREADS={threads}", '--set', f"OPENCV_THREADS={threads}",
+            '--workdir', workdir, '--output', output,
+        ]
+        for spec in clips:
+            command += ['--clip', spec]
+        if model_path:
+            command += ['--model-path', model_path]
+
+        env = dict(os.environ, BENCHMARK_DATABASE_URL=f"sqlite:///{os.path.join(layout_dir, f'proc{index}.db')}")
+        running.append((subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL), output))
+
+    throughput = 0.0
+    for process, output in running:
+        if process.wait() != 0:
+            raise click.ClickException(f"O benchmark do layout {processes}x{threads} falhou.")
+        with open(output) as f:
+            report = json.load(f)
+        runs = [run for clip in report['clips'].values() for run in clip['runs']]
+        frames = sum(run['frames_analyzed'] for run in runs)
+        seconds = sum(run['wall_seconds'] for run in runs)
+        throughput += frames / seconds if seconds else 0.0
+    return throughput
+
+@click.command()
+@click.option('--clip', 'clips', multiple=True, help='Clipe da mistura "LARGURAxALTURA@FPS:DURAÇÃO" (repetível).')
+@click.option('--layout', 'layouts', multiple=True, help='Layout PROCESSOSxTHREADS a testar (repetível; padrão: 1xN ... Nx1).')
+@click.option('--repeat', default=2, show_default=True, help='Execuções de cada clipe por processo.')
+@click.option('--model', type=click.Choice(['stub', 'real']), default='real', show_default=True)
+@click.option('--model-path', default=None, help='Arquivo do modelo real (padrão: MODEL_CONFIG).')
+@click.option('--workdir', default='/tmp/deep_autotune', show_default=True)
+@click.option('--output', default=None, help='Grava os resultados de todos os layouts em JSON.')
+def main(clips, layouts, repeat, model, model_path, workdir, output):
+    """Compara layouts (processos do Celery x threads por processo) e recomenda o mais rápido no host."""
+    from app.tasks.thread_tuning import available_cpus
+
+    clips = clips or DEFAULT_MIX
+    layouts = [parse_layout(raw) for raw in layouts] or default_layouts(available_cpus())
+
+    # Os clipes são gerados antes, para não disputarem CPU com as medições
+    for spec in clips:
+        ensure_clip(spec, os.path.join(workdir, 'clips'))
+
+    results = []
+    for processes, threads in layouts:
+        click.echo(f"Layout {processes} processo(s) x {threads} thread(s)...")
+        throughput = run_layout(processes, threads, clips, repeat, model, model_path, workdir)
+        results.append({'processes': processes, 'threads': threads, 'frames_per_second': throughput})
+        click.echo(f"  {throughput:.1f} frames/s")
+
+    best = max(results, key=lambda result: result['frames_per_second'])
+    click.echo(
+        f"\nRecomendado: {best['processes']} processo(s) x {best['threads']} thread(s) "
+        f"({best['frames_per_second']:.1f} frames/s)\n"
+        f"  celery -A celery_worker.celery worker --concurrency {best['processes']}\n"
+        f"  TF_INTRA_OP_THREADS={best['threads']} OPENCV_THREADS={best['threads']}"
+    )
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'layouts': results, 'recommended': best}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/compare.py
+
+import json
+import sys
+import click
+
+# Etapas mais rápidas que isso no baseline são ignoradas (o ruído domina a medida)
+MIN_STAGE_SECONDS = 0.05
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def relative_change(baseline_value, current_value):
+    return (current_value - baseline_value) / baseline_value if baseline_value else 0.0
+
+def compare_results(baseline, current, tolerance=0.10, min_stage_seconds=MIN_STAGE_SECONDS):
+    """
+    Compara dois resultados do benchmarks/run.py clipe a clipe.
+    Retorna a lista de regressões: tempos (total e por etapa) que subiram, ou
+    throughput que caiu, mais que 'tolerance' (fração) em relação ao baseline.
+    """
+    regressions = []
+    for name, base_clip in baseline.get('clips', {}).items():
+        clip = current.get('clips', {}).get(name)
+        if clip is None:
+            continue
+
+        checks = [
+            ('wall_seconds', base_clip['wall_seconds'], clip['wall_seconds'], False),
+            ('frames_per_second', base_clip['frames_per_second'], clip['frames_per_second'], True),
+        ]
+        for stage, base_stage in base_clip.get('stages', {}).items():
+            if base_stage['seconds'] < min_stage_seconds or stage not in clip.get('stages', {}):
+                continue
+            checks.append((f"stages.{stage}.seconds", base_stage['seconds'], clip['stages'][stage]['seconds'], False))
+
+        for metric, base_value, value, higher_is_better in checks:
+            change = relative_change(base_value, value)
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            if regressed:
+                regressions.append({
+                    'clip': name,
+                    'metric': metric,
+                    'baseline': base_value,
+                    'current': value,
+                    'change': round(change, 4),
+                })
+    return regressions
+
+def print_regressions(regressions, tolerance):
+    if not regressions:
+        click.echo(f"Nenhuma regressão acima de {tolerance:.0%}.")
+        return
+    click.echo(f"{len(regressions)} regressão(ões) acima de {tolerance:.0%}:")
+    for item in regressions:
+        click.echo(f"  {item['clip']} {item['metric']}: {item['baseline']:.4f} -> {item['current']:.4f} ({item['change']:+.1%})")
+
+@click.command()
+@click.argument('results_path')
+@click.option('--baseline', 'baseline_path', default='benchmarks/baseline.json', show_default=True)
+@click.option('--tolerance', default=0.10, show_default=True, help='Variação relativa aceita antes de acusar regressão.')
+def main(results_path, baseline_path, tolerance):
+    """Compara um resultado do benchmark com o baseline (código de saída 1 se houver regressão)."""
+    regressions = compare_results(load_results(baseline_path), load_results(results_path), tolerance)
+    print_regressions(regressions, tolerance)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/import_budget.py
+
+import json
+import subprocess
+import sys
+import click
+
+# Módulos que só o worker usa: não podem ser carregados no boot da API
+FORBIDDEN_MODULES = ['tensorflow', 'keras', 'cv2', 'boto3', 'botocore', 'app.tasks']
+# Tempo máximo do boot da API (import + create_app), também usado por tests/test_import_budget.py
+MAX_BOOT_SECONDS = 3.0
+
+# Executado num interpretador novo: mede o boot da API (create_app) do zero
+BOOT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+create_app(sys.argv[1])
+print(json.dumps({'seconds': time.perf_counter() - started, 'modules': sorted(sys.modules)}))
+"""
+
+def parse_importtime(stderr, limit):
+    """Módulos com maior tempo acumulado na saída de -X importtime (microssegundos)."""
+    entries = []
+    for line in stderr.splitlines():
+        # Formato: "import time:  <self us> | <cumulative us> | <módulo>"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((int(cumulative_us), name.strip()))
+    # Só os módulos de topo: os submódulos já estão somados no tempo acumulado do pai
+    top_level = [(us, name) for us, name in entries if '.' not in name]
+    return sorted(top_level, reverse=True)[:limit]
+
+def measure_boot(config_name, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', BOOT_SCRIPT, config_name]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise click.ClickException(f"O boot da API falhou:\n{completed.stderr[-2000:]}")
+    # A última linha é o JSON (o create_app pode imprimir antes)
+    return json.loads(completed.stdout.strip().splitlines()[-1]), completed.stderr
+
+def forbidden_modules(boot):
+    """Módulos do worker carregados no boot medido por measure_boot()."""
+    loaded = set(boot['modules'])
+    return [name for name in FORBIDDEN_MODULES if name in loaded]
+
+@click.command()
+@click.option('--config', 'config_name', default='testing', show_default=True, help='Configuração passada ao create_app.')
+@click.option('--max-seconds', default=MAX_BOOT_SECONDS, show_default=True, help='Tempo máximo do boot (import + create_app).')
+@click.option('--show-slowest', default=0, show_default=True, help='Lista os N imports de topo mais lentos (-X importtime).')
+def main(config_name, max_seconds, show_slowest):
+    """Confere que a API sobe sem importar o TensorFlow, o OpenCV e as tarefas do worker (código de saída 1 se não)."""
+    boot, stderr = measure_boot(config_name, importtime=show_slowest > 0)
+    heavy = forbidden_modules(boot)
+
+    click.echo(f"Boot da API: {boot['seconds']:.2f}s (limite {max_seconds:.2f}s), {len(boot['modules'])} módulos carregados")
+    for cumulative_us, name in parse_importtime(stderr, show_slowest):
+        click.echo(f"  {cumulative_us / 1e6:8.3f}s  {name}")
+
+    failed = False
+    if heavy:
+        click.echo(f"Módulos do worker importados pela API: {', '.join(heavy)}")
+        failed = True
+    if boot['seconds'] > max_seconds:
+        click.echo("O boot da API passou do limite de tempo.")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
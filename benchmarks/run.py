@@ -0,0 +1,236 @@
+# benchmarks/run.py
+
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+import click
+
+from .compare import compare_results, load_results, print_regressions
+from .stub_model import StubEmotionModel
+from .synthetic_video import DEFAULT_CLIPS, clip_name, ensure_clip
+
+BENCHMARK_USER_ID = 'benchmark-user'
+
+class NullSocketIO:
+    """Descarta os eventos de progresso: o benchmark mede o pipeline, não o Socket.IO."""
+
+    def emit(self, *args, **kwargs):
+        pass
+
+def parse_override(raw):
+    """Converte "CHAVE=VALOR" (VALOR em JSON quando possível) num par da configuração."""
+    key, sep, value = raw.partition('=')
+    if not sep:
+        raise click.BadParameter(f"Use CHAVE=VALOR: '{raw}'")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def stage_totals():
+    """Soma acumulada (segundos e chamadas) de cada etapa em deep_stage_duration_seconds."""
+    from app.metrics import STAGE_SECONDS
+
+    totals = {}
+    for metric in STAGE_SECONDS.collect():
+        for sample in metric.samples:
+            stage = sample.labels.get('stage')
+            if sample.name.endswith('_sum'):
+                totals.setdefault(stage, {})['seconds'] = sample.value
+            elif sample.name.endswith('_count'):
+                totals.setdefault(stage, {})['calls'] = int(sample.value)
+    return totals
+
+def stage_deltas(before, after):
+    deltas = {}
+    for stage, values in after.items():
+        previous = before.get(stage, {})
+        calls = values.get('calls', 0) - previous.get('calls', 0)
+        if calls:
+            deltas[stage] = {
+                'seconds': values.get('seconds', 0.0) - previous.get('seconds', 0.0),
+                'calls': calls,
+            }
+    return deltas
+
+def prepare_app(storage_path, overrides):
+    """Cria a aplicação com a BenchmarkConfig, um banco SQLite vazio e o usuário do benchmark."""
+    from app import create_app, create_celery
+    from app.extensions import db
+    from app.models import User
+
+    app = create_app('benchmark')
+    app.config['LOCAL_STORAGE_PATH'] = storage_path
+    app.config.update(overrides)
+    create_celery(app)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(id=BENCHMARK_USER_ID, username='benchmark', email='benchmark@example.com', password_hash='-'))
+        db.session.commit()
+    return app
+
+def install_model(app, model, model_path, latency_ms, concurrency):
+    """
+    Deixa o modelo (falso ou real) carregado no processo antes das medições, com
+    os pools de threads dimensionados como num worker com 'concurrency' processos.
+    """
+    from app.tasks import process_video_task
+    from app.tasks.inference_backends import create_backend
+    from app.tasks.thread_tuning import apply_thread_settings, derive_thread_settings
+
+    thread_settings = derive_thread_settings(app.config, concurrency)
+    # O modelo falso não usa o TensorFlow: não há por que importá-lo
+    apply_thread_settings(thread_settings, tensorflow=model != 'stub')
+    process_video_task.socketio_celery = NullSocketIO()
+    if model == 'stub':
+        process_video_task.loaded_model = StubEmotionModel(latency_ms_per_frame=latency_ms)
+    else:
+        config = process_video_task.MODEL_CONFIG
+        backend_name = config['backend']
+        default_path = config['local_path'] if backend_name == 'keras' else config[backend_name]['local_path']
+        process_video_task.loaded_model = create_backend(backend_name, model_path or default_path, config['num_threads'])
+
+    with app.app_context():
+        process_video_task.warm_up_model(
+            process_video_task.loaded_model,
+            app.config.get('INFERENCE_BATCH_SIZE', process_video_task.INFERENCE_BATCH_SIZE)
+        )
+    return thread_settings
+
+def run_once(app, clip_path):
+    """Processa o clipe uma vez pela tarefa real e retorna as medidas da execução."""
+    from app import services
+    from app.models import VideoStatus
+    from app.tasks import process_video
+
+    # O modo local lê o vídeo de LOCAL_STORAGE_PATH/videos/<nome do arquivo da chave>
+    filename = f"{uuid.uuid4()}.mp4"
+    videos_dir = os.path.join(app.config['LOCAL_STORAGE_PATH'], 'videos')
+    os.makedirs(videos_dir, exist_ok=True)
+    shutil.copy(clip_path, os.path.join(videos_dir, filename))
+
+    with app.app_context():
+        video = services.create_video_record(BENCHMARK_USER_ID, os.path.basename(clip_path), f"uploads/{BENCHMARK_USER_ID}/{filename}")
+        video_id = video.id
+
+    before = stage_totals()
+    started = time.perf_counter()
+    process_video.apply(args=[video_id])
+    wall_seconds = time.perf_counter() - started
+    stages = stage_deltas(before, stage_totals())
+
+    with app.app_context():
+        video = services.get_video_by_id(video_id)
+        if video.status != VideoStatus.COMPLETED:
+            raise click.ClickException(f"O processamento de {clip_path} terminou com status {video.status.value}.")
+        frames_analyzed = video.frame_count
+
+    os.remove(os.path.join(videos_dir, filename))
+    return {
+        'wall_seconds': wall_seconds,
+        'frames_analyzed': frames_analyzed,
+        'frames_per_second': frames_analyzed / wall_seconds if wall_seconds > 0 else 0.0,
+        'stages': stages,
+    }
+
+def summarize(spec, runs):
+    """Mediana das repetições (o primeiro run já vem depois do aquecimento do modelo)."""
+    stage_names = sorted({stage for run in runs for stage in run['stages']})
+    return {
+        'spec': spec,
+        'repeat': len(runs),
+        'frames_analyzed': runs[-1]['frames_analyzed'],
+        'wall_seconds': statistics.median(run['wall_seconds'] for run in runs),
+        'frames_per_second': statistics.median(run['frames_per_second'] for run in runs),
+        'stages': {
+            stage: {
+                'seconds': statistics.median(run['stages'].get(stage, {}).get('seconds', 0.0) for run in runs),
+                'calls': runs[-1]['stages'].get(stage, {}).get('calls', 0),
+            }
+            for stage in stage_names
+        },
+        'runs': runs,
+    }
+
+@click.command()
+@click.option('--clip', 'clips', multiple=True, help='Clipe "LARGURAxALTURA@FPS:DURAÇÃO" (repetível).')
+@click.option('--repeat', default=3, show_default=True, help='Execuções por clipe (reporta a mediana).')
+@click.option('--model', type=click.Choice(['stub', 'real']), default='stub', show_default=True)
+@click.option('--model-path', default=None, help='Arquivo do modelo real (padrão: MODEL_CONFIG).')
+@click.option('--stub-latency-ms', default=0.0, show_default=True, help='Latência simulada por frame do modelo falso.')
+@click.option('--concurrency', default=1, show_default=True,
+              help='Processos simultâneos no host (divide os CPUs entre os pools de threads).')
+@click.option('--faststart', is_flag=True, help='Gera os clipes com o moov no início (necessário para STREAMING_INGEST_ENABLED).')
+@click.option('--set', 'overrides', multiple=True, help='Sobrescreve a configuração: CHAVE=VALOR (repetível).')
+@click.option('--workdir', default='/tmp/deep_benchmark', show_default=True, help='Clipes gerados e armazenamento local.')
+@click.option('--output', default=None, help='Arquivo JSON de saída (padrão: stdout).')
+@click.option('--baseline', 'baseline_path', default=None, help='Baseline para comparar ao final.')
+@click.option('--tolerance', default=0.10, show_default=True)
+@click.option('--save-baseline', is_flag=True, help='Grava o resultado também em benchmarks/baseline.json.')
+def main(clips, repeat, model, model_path, stub_latency_ms, concurrency, faststart, overrides, workdir, output, baseline_path, tolerance, save_baseline):
+    """Executa o process_video de ponta a ponta sobre clipes sintéticos e mede cada etapa."""
+    overrides = dict(parse_override(raw) for raw in overrides)
+    clips = clips or DEFAULT_CLIPS
+
+    app = prepare_app(os.path.join(workdir, 'storage'), overrides)
+    thread_settings = install_model(app, model, model_path, stub_latency_ms, concurrency)
+
+    results = {}
+    for spec in clips:
+        clip_path = ensure_clip(spec, os.path.join(workdir, 'clips'), faststart=faststart)
+        click.echo(f"Executando {spec} ({repeat}x)...", err=True)
+        results[clip_name(spec)] = summarize(spec, [run_once(app, clip_path) for _ in range(repeat)])
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'model': model,
+            'stub_latency_ms': stub_latency_ms if model == 'stub' else None,
+            'overrides': overrides,
+            'concurrency': concurrency,
+            'faststart': faststart,
+            'thread_settings': thread_settings,
+            # ru_maxrss é em KB no Linux
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        },
+        'clips': results,
+    }
+
+    payload = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(payload)
+    else:
+        click.echo(payload)
+    if save_baseline:
+        with open(os.path.join(os.path.dirname(__file__), 'baseline.json'), 'w') as f:
+            f.write(payload)
+
+    if baseline_path:
+        regressions = compare_results(load_results(baseline_path), report, tolerance)
+        print_regressions(regressions, tolerance)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
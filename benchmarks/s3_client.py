@@ -0,0 +1,118 @@
+# benchmarks/s3_client.py
+
+import json
+import os
+import socket
+import statistics
+import time
+import click
+
+BENCHMARK_BUCKET = 'deep-benchmark-videos'
+BENCHMARK_KEY = 'uploads/benchmark-user/sample.mp4'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_moto_server():
+    """S3 em memória (moto) numa thread local; retorna (servidor, endpoint)."""
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        raise click.ClickException("Instale 'moto[server]' ou informe um S3 compatível em --endpoint-url.")
+    port = free_port()
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+    server.start()
+    return server, f"http://127.0.0.1:{port}"
+
+def fresh_client(app):
+    """Comportamento anterior: um boto3.client novo (e um pool de conexões novo) por chamada."""
+    import boto3
+
+    return boto3.client(
+        's3',
+        aws_access_key_id=app.config['AWS_ACCESS_KEY_ID'],
+        aws_secret_access_key=app.config['AWS_SECRET_ACCESS_KEY'],
+        region_name=app.config['AWS_REGION'],
+        endpoint_url=app.config['S3_ENDPOINT_URL']
+    )
+
+def run_operation(client, operation):
+    if operation == 'presign_get':
+        client.generate_presigned_url('get_object', Params={'Bucket': BENCHMARK_BUCKET, 'Key': BENCHMARK_KEY}, ExpiresIn=3600)
+    elif operation == 'head_object':
+        client.head_object(Bucket=BENCHMARK_BUCKET, Key=BENCHMARK_KEY)
+    else:
+        client.get_object(Bucket=BENCHMARK_BUCKET, Key=BENCHMARK_KEY)['Body'].read()
+
+def measure(get_client, operation, request_count):
+    """Latência (ms) de cada requisição, incluindo a obtenção do cliente."""
+    latencies = []
+    for _ in range(request_count):
+        started = time.perf_counter()
+        run_operation(get_client(), operation)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        'median_ms': statistics.median(latencies),
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+@click.command()
+@click.option('--endpoint-url', default=None, help='S3 compatível já em execução (padrão: servidor do moto local).')
+@click.option('--requests', 'request_count', default=200, show_default=True, help='Requisições por operação e modo.')
+@click.option('--object-size-kb', default=64, show_default=True, help='Tamanho do objeto lido pelo get_object.')
+@click.option('--output', default=None, help='Grava o resultado em JSON.')
+def main(endpoint_url, request_count, object_size_kb, output):
+    """Compara a latência por requisição do cliente S3 criado a cada chamada com o cliente compartilhado."""
+    from app import create_app
+    from app.services.s3_service import s3_get_client
+
+    server = None
+    if not endpoint_url:
+        server, endpoint_url = start_moto_server()
+
+    app = create_app('benchmark')
+    app.config.update(
+        STORAGE_TYPE='s3',
+        S3_ENDPOINT_URL=endpoint_url,
+        S3_ADDRESSING_STYLE='path',
+        S3_VIDEOS_BUCKET=BENCHMARK_BUCKET,
+        AWS_ACCESS_KEY_ID=os.environ.get('AWS_ACCESS_KEY_ID', 'benchmark'),
+        AWS_SECRET_ACCESS_KEY=os.environ.get('AWS_SECRET_ACCESS_KEY', 'benchmark'),
+    )
+
+    results = {}
+    try:
+        with app.app_context():
+            client = s3_get_client()
+            try:
+                client.create_bucket(Bucket=BENCHMARK_BUCKET)
+            except client.exceptions.BucketAlreadyOwnedByYou:
+                pass
+            client.put_object(Bucket=BENCHMARK_BUCKET, Key=BENCHMARK_KEY, Body=os.urandom(object_size_kb * 1024))
+
+            for operation in ('presign_get', 'head_object', 'get_object'):
+                results[operation] = {
+                    'fresh': measure(lambda: fresh_client(app), operation, request_count),
+                    'pooled': measure(s3_get_client, operation, request_count),
+                }
+    finally:
+        if server:
+            server.stop()
+
+    click.echo(f"{'operação':<14}{'novo cliente (mediana/p95)':>30}{'compartilhado (mediana/p95)':>32}")
+    for operation, modes in results.items():
+        fresh, pooled = modes['fresh'], modes['pooled']
+        click.echo(
+            f"{operation:<14}{fresh['median_ms']:>17.2f} / {fresh['p95_ms']:>7.2f} ms"
+            f"{pooled['median_ms']:>19.2f} / {pooled['p95_ms']:>7.2f} ms"
+        )
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'endpoint_url': endpoint_url, 'requests': request_count, 'operations': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/s3_multipart.py
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import click
+
+from .s3_client import BENCHMARK_BUCKET, start_moto_server
+
+def put_part(url, data):
+    """Envia uma parte para a URL pré-assinada (como o cliente faria) e retorna o ETag."""
+    request = urllib.request.Request(url, data=data, method='PUT')
+    with urllib.request.urlopen(request) as response:
+        return response.headers['ETag']
+
+@click.command()
+@click.option('--endpoint-url', default=None, help='S3 compatível já em execução (padrão: servidor do moto local).')
+@click.option('--size-mb', default=64, show_default=True, help='Tamanho do vídeo de teste.')
+@click.option('--part-size-mb', default=8, show_default=True, help='S3_MULTIPART_PART_SIZE e S3_TRANSFER_CHUNK_SIZE.')
+@click.option('--concurrency', default=4, show_default=True, help='Partes enviadas em paralelo e S3_TRANSFER_MAX_CONCURRENCY.')
+def main(endpoint_url, size_mb, part_size_mb, concurrency):
+    """
+    Upload multipart pré-assinado de ponta a ponta (iniciar, enviar as partes,
+    concluir) seguido do download do worker com o TransferConfig; confere o SHA-256.
+    """
+    from app import create_app, services
+    from app.services.s3_service import s3_get_client
+
+    server = None
+    if not endpoint_url:
+        server, endpoint_url = start_moto_server()
+
+    app = create_app('benchmark')
+    app.config.update(
+        STORAGE_TYPE='s3',
+        S3_ENDPOINT_URL=endpoint_url,
+        S3_ADDRESSING_STYLE='path',
+        S3_VIDEOS_BUCKET=BENCHMARK_BUCKET,
+        AWS_ACCESS_KEY_ID=os.environ.get('AWS_ACCESS_KEY_ID', 'benchmark'),
+        AWS_SECRET_ACCESS_KEY=os.environ.get('AWS_SECRET_ACCESS_KEY', 'benchmark'),
+        S3_MULTIPART_PART_SIZE=part_size_mb * 1024 * 1024,
+        S3_TRANSFER_CHUNK_SIZE=part_size_mb * 1024 * 1024,
+        S3_TRANSFER_MAX_CONCURRENCY=concurrency,
+    )
+
+    payload = os.urandom(size_mb * 1024 * 1024)
+    s3_key = 'uploads/benchmark-user/multipart.mp4'
+    try:
+        with app.app_context():
+            client = s3_get_client()
+            try:
+                client.create_bucket(Bucket=BENCHMARK_BUCKET)
+            except client.exceptions.BucketAlreadyOwnedByYou:
+                pass
+
+            upload = services.s3_create_multipart_upload(s3_key, len(payload))
+            if not upload:
+                raise click.ClickException("Não foi possível iniciar o upload multipart.")
+            part_size = upload['part_size']
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                etags = list(executor.map(
+                    lambda part: put_part(part['url'], payload[(part['part_number'] - 1) * part_size:part['part_number'] * part_size]),
+                    upload['parts']
+                ))
+            upload_seconds = time.perf_counter() - started
+            parts = [{'part_number': part['part_number'], 'etag': etag} for part, etag in zip(upload['parts'], etags)]
+            if not services.s3_complete_multipart_upload(s3_key, upload['upload_id'], parts):
+                raise click.ClickException("Não foi possível concluir o upload multipart.")
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                destination = os.path.join(temp_dir, 'video.mp4')
+                started = time.perf_counter()
+                if not services.download_video_from_s3(s3_key, destination):
+                    raise click.ClickException("Falha no download do vídeo.")
+                download_seconds = time.perf_counter() - started
+                with open(destination, 'rb') as f:
+                    downloaded_hash = hashlib.sha256(f.read()).hexdigest()
+    finally:
+        if server:
+            server.stop()
+
+    matches = downloaded_hash == hashlib.sha256(payload).hexdigest()
+    click.echo(f"{len(upload['parts'])} partes de {part_size / 1024 / 1024:g} MiB")
+    click.echo(f"Upload:   {upload_seconds:.2f}s ({size_mb / upload_seconds:.1f} MiB/s)")
+    click.echo(f"Download: {download_seconds:.2f}s ({size_mb / download_seconds:.1f} MiB/s)")
+    click.echo("Conteúdo íntegro." if matches else "O conteúdo baixado difere do enviado!")
+    sys.exit(0 if matches else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+# benchmarks/stub_model.py
+
+import time
+import numpy as np
+
+NUM_CLASSES = 7
+
+class StubEmotionModel:
+    """
+    Substituto do modelo_emocoes.h5 com a mesma interface dos backends
+    (predict_batch: float32 (B, 48, 48, 1) -> confianças (B, 7)).
+
+    As confianças são deterministas e dependem do conteúdo do frame, então a
+    deduplicação e a amostragem adaptativa se comportam como com o modelo real.
+    'latency_ms_per_frame' simula o custo da inferência.
+    """
+
+    name = 'stub'
+
+    def __init__(self, latency_ms_per_frame=0.0, seed=0):
+        self.latency = latency_ms_per_frame / 1000.0
+        rng = np.random.default_rng(seed)
+        # Projeção fixa de 4 estatísticas do frame para os 7 logits
+        self.projection = rng.normal(0, 4, (4, NUM_CLASSES)).astype(np.float32)
+
+    def predict_batch(self, batch):
+        if self.latency:
+            time.sleep(self.latency * len(batch))
+
+        flat = batch.reshape(len(batch), -1)
+        half = flat.shape[1] // 2
+        features = np.stack([
+            flat.mean(axis=1),
+            flat.std(axis=1),
+            flat[:, :half].mean(axis=1),
+            flat[:, half:].mean(axis=1),
+        ], axis=1)
+        logits = features @ self.projection
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
@@ -0,0 +1,129 @@
+# benchmarks/synthetic_video.py
+
+import os
+import re
+import struct
+import cv2
+import numpy as np
+
+# Clipes usados quando nenhum é informado: "LARGURAxALTURA@FPS:DURAÇÃO"
+DEFAULT_CLIPS = ['640x360@30:10', '1280x720@30:10', '1920x1080@60:10']
+
+CLIP_PATTERN = re.compile(r'^(\d+)x(\d+)@(\d+(?:\.\d+)?):(\d+(?:\.\d+)?)$')
+
+def parse_clip_spec(spec):
+    """Converte "1280x720@30:10" em (largura, altura, fps, duração em segundos)."""
+    match = CLIP_PATTERN.match(spec.strip())
+    if not match:
+        raise ValueError(f"Clipe inválido: '{spec}' (formato esperado: LARGURAxALTURA@FPS:DURAÇÃO)")
+    width, height, fps, duration = match.groups()
+    return int(width), int(height), float(fps), float(duration)
+
+def clip_name(spec):
+    width, height, fps, duration = parse_clip_spec(spec)
+    return f"{width}x{height}_{fps:g}fps_{duration:g}s"
+
+def draw_frame(width, height, index, fps, rng):
+    """
+    Desenha um frame com um "rosto" (elipse com olhos e boca) que se move e muda
+    de expressão ao longo do tempo, sobre um fundo em gradiente com ruído.
+    """
+    t = index / fps
+    gradient = np.linspace(40, 200, width, dtype=np.float32)
+    frame = np.repeat(gradient[np.newaxis, :, np.newaxis], height, axis=0).repeat(3, axis=2)
+    frame += rng.normal(0, 6, frame.shape).astype(np.float32)
+    frame = np.clip(frame, 0, 255).astype(np.uint8)
+
+    face_h = height // 3
+    face_w = int(face_h * 0.8)
+    center_x = int(width / 2 + np.sin(t * 0.7) * width / 4)
+    center_y = int(height / 2 + np.cos(t * 0.5) * height / 8)
+    cv2.ellipse(frame, (center_x, center_y), (face_w // 2, face_h // 2), 0, 0, 360, (170, 190, 220), -1)
+
+    eye_dy = face_h // 6
+    eye_dx = face_w // 5
+    eye_r = max(face_h // 20, 2)
+    for side in (-1, 1):
+        cv2.circle(frame, (center_x + side * eye_dx, center_y - eye_dy), eye_r, (40, 40, 40), -1)
+
+    # A curvatura da boca varia com o tempo (muda o conteúdo do recorte do rosto)
+    mouth_curve = int(np.sin(t * 1.3) * face_h / 10)
+    mouth_y = center_y + face_h // 5
+    cv2.ellipse(frame, (center_x, mouth_y), (face_w // 4, max(abs(mouth_curve), 1)), 0,
+                0 if mouth_curve >= 0 else 180, 180 if mouth_curve >= 0 else 360, (60, 40, 120), 2)
+    return frame
+
+def generate_video(path, width, height, fps, duration, seed=0, fourcc='mp4v'):
+    """Grava um clipe sintético com cv2.VideoWriter e retorna o caminho."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"Não foi possível criar o vídeo em: {path}")
+
+    rng = np.random.default_rng(seed)
+    try:
+        for index in range(int(round(fps * duration))):
+            writer.write(draw_frame(width, height, index, fps, rng))
+    finally:
+        writer.release()
+    return path
+
+def read_boxes(data, start, end):
+    """Caixas (tipo, início, tamanho) do MP4 entre 'start' e 'end' (tamanhos de 32 bits)."""
+    boxes = []
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+        if size < 8:
+            break
+        boxes.append((box_type, offset, size))
+        offset += size
+    return boxes
+
+def shift_chunk_offsets(moov, start, end, delta):
+    """Soma 'delta' aos offsets das tabelas stco/co64 dentro do moov."""
+    for box_type, offset, size in read_boxes(moov, start, end):
+        if box_type in (b'trak', b'mdia', b'minf', b'stbl'):
+            shift_chunk_offsets(moov, offset + 8, offset + size, delta)
+        elif box_type in (b'stco', b'co64'):
+            entry_format, entry_size = ('>I', 4) if box_type == b'stco' else ('>Q', 8)
+            count = struct.unpack('>I', moov[offset + 12:offset + 16])[0]
+            for position in range(offset + 16, offset + 16 + count * entry_size, entry_size):
+                value = struct.unpack(entry_format, moov[position:position + entry_size])[0]
+                struct.pack_into(entry_format, moov, position, value + delta)
+
+def move_moov_to_start(path):
+    """
+    Reescreve o MP4 com o moov antes do mdat ("faststart"), como faz a
+    maioria dos celulares: o cv2.VideoWriter grava o moov no fim.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    boxes = read_boxes(data, 0, len(data))
+    moov_box = next((box for box in boxes if box[0] == b'moov'), None)
+    mdat_box = next((box for box in boxes if box[0] == b'mdat'), None)
+    if moov_box is None or mdat_box is None or moov_box[1] < mdat_box[1]:
+        return path
+
+    moov = bytearray(data[moov_box[1]:moov_box[1] + moov_box[2]])
+    # Os dados do mdat se deslocam exatamente o tamanho do moov
+    shift_chunk_offsets(moov, 8, len(moov), len(moov))
+    with open(path, 'wb') as f:
+        for box_type, offset, size in boxes:
+            if box_type == b'moov':
+                continue
+            if box_type == b'mdat':
+                f.write(moov)
+            f.write(data[offset:offset + size])
+    return path
+
+def ensure_clip(spec, output_dir, seed=0, faststart=False):
+    """Gera o clipe da especificação em 'output_dir', reaproveitando se já existir."""
+    suffix = '_faststart' if faststart else ''
+    path = os.path.join(output_dir, f"{clip_name(spec)}_seed{seed}{suffix}.mp4")
+    if not os.path.exists(path):
+        width, height, fps, duration = parse_clip_spec(spec)
+        generate_video(path, width, height, fps, duration, seed=seed)
+        if faststart:
+            move_moov_to_start(path)
+    return path
@@ -19,8 +19,113 @@ class Config:
         broker_url=os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0"),
         result_backend=os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0"),
         task_ignore_result=True,
+        # Tarefas com acks_late só são reentregues depois deste tempo (vídeos longos demoram mais)
+        broker_transport_options={'visibility_timeout': int(os.environ.get("CELERY_VISIBILITY_TIMEOUT", 7200))},
     )
     
+    # --- Processamento de Vídeo ---
+    TARGET_FPS = float(os.environ.get('TARGET_FPS', 24))
+    MAX_TARGET_FPS = float(os.environ.get('MAX_TARGET_FPS', 60))
+    # 'uniform' (todos os frames na taxa alvo) ou 'adaptive' (densifica só onde as emoções mudam)
+    SAMPLING_MODE = os.environ.get('SAMPLING_MODE', 'uniform')
+    ADAPTIVE_COARSE_FPS = float(os.environ.get('ADAPTIVE_COARSE_FPS', 4))
+    ADAPTIVE_CHANGE_THRESHOLD = float(os.environ.get('ADAPTIVE_CHANGE_THRESHOLD', 0.1))
+    INFERENCE_BATCH_SIZE = int(os.environ.get('INFERENCE_BATCH_SIZE', 32))
+    FRAME_QUEUE_SIZE = int(os.environ.get('FRAME_QUEUE_SIZE', 4))
+
+    # Localização de rostos antes da inferência ('haar' ou 'dnn'). Desativada por padrão até ser
+    # medida com 'python -m benchmarks.run --set FACE_DETECTION_ENABLED=true' no host do worker
+    FACE_DETECTION_ENABLED = os.environ.get('FACE_DETECTION_ENABLED', 'false').lower() in ('true', '1', 'yes')
+    FACE_DETECTOR = os.environ.get('FACE_DETECTOR', 'haar')
+    # O detector roda a cada N frames amostrados; entre eles a caixa é reaproveitada (ou rastreada
+    # com KCF, se disponível) enquanto o recorte não diferir do rosto detectado mais que FACE_LOSS_THRESHOLD
+    FACE_DETECTION_INTERVAL = int(os.environ.get('FACE_DETECTION_INTERVAL', 10))
+    FACE_LOSS_THRESHOLD = float(os.environ.get('FACE_LOSS_THRESHOLD', 40))
+    FACE_HAAR_CASCADE = os.environ.get('FACE_HAAR_CASCADE')
+    FACE_DNN_PROTOTXT = os.environ.get('FACE_DNN_PROTOTXT')
+    FACE_DNN_MODEL = os.environ.get('FACE_DNN_MODEL')
+
+    # Frames com diferença absoluta média (0-255) abaixo do limiar reaproveitam a predição anterior (0 desativa)
+    DEDUP_THRESHOLD = float(os.environ.get('DEDUP_THRESHOLD', 0.0))
+
+    # Modo em memória: o vídeo inteiro é analisado e gravado numa única transação
+    MAX_VIDEO_DURATION_SECONDS = float(os.environ.get('MAX_VIDEO_DURATION_SECONDS', 30))
+    # Modo em blocos (padrão na amostragem uniforme): grava os frames a cada CHUNK_SIZE resultados
+    # com checkpoint, então os resultados parciais ficam visíveis durante o processamento e a memória
+    # não cresce com a duração (CHUNKED_MAX_VIDEO_DURATION_SECONDS=0 remove o limite)
+    CHUNKED_PROCESSING_ENABLED = os.environ.get('CHUNKED_PROCESSING_ENABLED', 'true').lower() in ('true', '1', 'yes')
+    CHUNK_SIZE = int(os.environ.get('CHUNK_SIZE', 240))
+    CHUNKED_MAX_VIDEO_DURATION_SECONDS = float(os.environ.get('CHUNKED_MAX_VIDEO_DURATION_SECONDS', 3600))
+
+    # Streaming: o vídeo é baixado em partes (GETs com Range, STREAMING_CONCURRENCY em paralelo)
+    # direto para o decodificador. Só para MP4/MOV com o moov no início; os demais são baixados inteiros
+    STREAMING_INGEST_ENABLED = os.environ.get('STREAMING_INGEST_ENABLED', 'false').lower() in ('true', '1', 'yes')
+    STREAMING_PART_SIZE = int(os.environ.get('STREAMING_PART_SIZE', 8 * 1024 * 1024))
+    STREAMING_CONCURRENCY = int(os.environ.get('STREAMING_CONCURRENCY', 4))
+
+    # Eventos de progresso via Socket.IO: enviados à sala do dono quando o progresso avança
+    # PROGRESS_MIN_DELTA pontos ou após PROGRESS_MIN_INTERVAL segundos (COMPLETED/FAILED sempre)
+    PROGRESS_MIN_INTERVAL = float(os.environ.get('PROGRESS_MIN_INTERVAL', 1.0))
+    PROGRESS_MIN_DELTA = int(os.environ.get('PROGRESS_MIN_DELTA', 5))
+
+    # Status do processamento (GET /videos/<id>/status) num hash do Redis, sem consultar o MySQL
+    STATUS_REDIS_URL = os.environ.get('STATUS_REDIS_URL') or os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
+    STATUS_TTL_SECONDS = int(os.environ.get('STATUS_TTL_SECONDS', 86400))
+    STATUS_REDIS_TIMEOUT = float(os.environ.get('STATUS_REDIS_TIMEOUT', 0.5))
+
+    # URLs pré-assinadas de reprodução (GET /videos/<id>) reaproveitadas até PRESIGNED_URL_SAFETY_MARGIN
+    # segundos antes de expirar: no Redis do status e, sem ele, num LRU do processo
+    PRESIGNED_URL_CACHE_ENABLED = os.environ.get('PRESIGNED_URL_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes')
+    PRESIGNED_URL_EXPIRATION = int(os.environ.get('PRESIGNED_URL_EXPIRATION', 3600))
+    PRESIGNED_URL_SAFETY_MARGIN = int(os.environ.get('PRESIGNED_URL_SAFETY_MARGIN', 300))
+    PRESIGNED_URL_LRU_SIZE = int(os.environ.get('PRESIGNED_URL_LRU_SIZE', 1024))
+
+    # Métricas Prometheus: a API expõe /metrics; o worker expõe na porta WORKER_METRICS_PORT
+    # (0 desativa) e/ou envia para um Pushgateway. Com vários processos defina PROMETHEUS_MULTIPROC_DIR.
+    WORKER_METRICS_PORT = int(os.environ.get('WORKER_METRICS_PORT', 9100))
+    METRICS_PUSHGATEWAY_URL = os.environ.get('METRICS_PUSHGATEWAY_URL')
+
+    # Perfil de tarefas (cProfile + trace do TensorFlow), salvo no armazenamento ao lado do vídeo:
+    # sob demanda por administradores ou 1 a cada PROFILING_SAMPLE_RATE tarefas por processo (0 desativa).
+    # O trace do TensorFlow só é gravado com o backend Keras executado no próprio worker
+    PROFILING_SAMPLE_RATE = int(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+    PROFILING_TF_TRACE = os.environ.get('PROFILING_TF_TRACE', 'true').lower() in ('true', '1', 'yes')
+
+    # Pools de threads por processo do worker (0 = CPUs disponíveis / concorrência do Celery).
+    # Use 'python -m benchmarks.autotune' para escolher processos x threads no host.
+    TF_INTRA_OP_THREADS = int(os.environ.get('TF_INTRA_OP_THREADS', 0))
+    TF_INTER_OP_THREADS = int(os.environ.get('TF_INTER_OP_THREADS', 0))
+    OPENCV_THREADS = int(os.environ.get('OPENCV_THREADS', 0))
+
+    # Fan-out: divide vídeos longos em trechos processados em paralelo por um chord do Celery
+    FANOUT_ENABLED = os.environ.get('FANOUT_ENABLED', 'false').lower() in ('true', '1', 'yes')
+    FANOUT_SEGMENT_SECONDS = float(os.environ.get('FANOUT_SEGMENT_SECONDS', 10))
+    FANOUT_MAX_SEGMENTS = int(os.environ.get('FANOUT_MAX_SEGMENTS', 8))
+
+    # Reaproveita a análise quando o mesmo usuário reenvia um arquivo idêntico
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes')
+
+    # --- Servidor de Inferência (opcional, um por nó) ---
+    # Com o socket configurado, as tarefas enviam os frames ao servidor em vez de carregar o modelo
+    INFERENCE_SERVER_SOCKET = os.environ.get('INFERENCE_SERVER_SOCKET')
+    INFERENCE_SERVER_MAX_BATCH = int(os.environ.get('INFERENCE_SERVER_MAX_BATCH', 128))
+    INFERENCE_SERVER_MAX_WAIT_MS = float(os.environ.get('INFERENCE_SERVER_MAX_WAIT_MS', 10))
+    INFERENCE_SERVER_TIMEOUT = float(os.environ.get('INFERENCE_SERVER_TIMEOUT', 30))
+    # Depois de uma falha do servidor o processo usa o modelo local e tenta o servidor de novo
+    # após INFERENCE_SERVER_RETRY_SECONDS, dobrando a espera até INFERENCE_SERVER_RETRY_MAX_SECONDS
+    INFERENCE_SERVER_RETRY_SECONDS = float(os.environ.get('INFERENCE_SERVER_RETRY_SECONDS', 30))
+    INFERENCE_SERVER_RETRY_MAX_SECONDS = float(os.environ.get('INFERENCE_SERVER_RETRY_MAX_SECONDS', 600))
+
+    # --- Worker Celery ---
+    # Carrega e aquece o modelo em cada processo do worker, antes da primeira tarefa
+    MODEL_PRELOAD = os.environ.get('MODEL_PRELOAD', 'true').lower() in ('true', '1', 'yes')
+    # Pool prefork: carrega os pesos no processo principal para os filhos compartilharem por copy-on-write.
+    # Só com MODEL_BACKEND=tflite/tflite_int8 (inicializar o TensorFlow do Keras antes do fork não é seguro)
+    MODEL_PRELOAD_BEFORE_FORK = os.environ.get('MODEL_PRELOAD_BEFORE_FORK', 'false').lower() in ('true', '1', 'yes')
+    # Guarda quantos processos filhos precisam estar prontos; cada filho com o modelo carregado
+    # cria WORKER_READY_FILE.<pid> (usado pelo healthcheck)
+    WORKER_READY_FILE = os.environ.get('WORKER_READY_FILE', '/tmp/deep_worker_ready')
+
     # --- NOVO: Configuração de Armazenamento ---
     STORAGE_TYPE = os.environ.get('STORAGE_TYPE', 's3')
     LOCAL_STORAGE_PATH = '/app/uploads'
@@ -32,6 +137,24 @@ class Config:
     AWS_REGION = os.environ.get('AWS_REGION') or 'us-east-1'
     S3_VIDEOS_BUCKET = os.environ.get('S3_VIDEOS_BUCKET')
     S3_MODELS_BUCKET = os.environ.get('S3_MODELS_BUCKET')
+    # Endpoint de um S3 compatível (MinIO, moto); vazio usa o endpoint da AWS da região
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL') or None
+    S3_ADDRESSING_STYLE = os.environ.get('S3_ADDRESSING_STYLE', 'auto')
+    # Cliente S3 compartilhado por processo: conexões mantidas no pool, retentativas e timeouts
+    S3_MAX_POOL_CONNECTIONS = int(os.environ.get('S3_MAX_POOL_CONNECTIONS', 32))
+    S3_MAX_ATTEMPTS = int(os.environ.get('S3_MAX_ATTEMPTS', 5))
+    S3_RETRY_MODE = os.environ.get('S3_RETRY_MODE', 'standard')
+    S3_CONNECT_TIMEOUT = float(os.environ.get('S3_CONNECT_TIMEOUT', 5))
+    S3_READ_TIMEOUT = float(os.environ.get('S3_READ_TIMEOUT', 60))
+    # Upload multipart pré-assinado (vídeos grandes): partes de S3_MULTIPART_PART_SIZE bytes (mínimo 5 MiB)
+    S3_MULTIPART_PART_SIZE = int(os.environ.get('S3_MULTIPART_PART_SIZE', 16 * 1024 * 1024))
+    S3_MULTIPART_URL_EXPIRATION = int(os.environ.get('S3_MULTIPART_URL_EXPIRATION', 21600))
+    # Tamanho máximo aceito ao iniciar um upload multipart (padrão: 10 GiB)
+    MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 10 * 1024 * 1024 * 1024))
+    # Downloads/uploads do worker (TransferConfig do boto3); a concorrência usa conexões do pool acima
+    S3_TRANSFER_MULTIPART_THRESHOLD = int(os.environ.get('S3_TRANSFER_MULTIPART_THRESHOLD', 16 * 1024 * 1024))
+    S3_TRANSFER_CHUNK_SIZE = int(os.environ.get('S3_TRANSFER_CHUNK_SIZE', 16 * 1024 * 1024))
+    S3_TRANSFER_MAX_CONCURRENCY = int(os.environ.get('S3_TRANSFER_MAX_CONCURRENCY', 8))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -49,8 +172,20 @@ class TestingConfig(Config):
     CELERY['result_backend'] = 'rpc://'
     STORAGE_TYPE = 'local' # Força o modo local para testes
 
+class BenchmarkConfig(TestingConfig):
+    """Usada por benchmarks/run.py: SQLite em arquivo, armazenamento local e sem serviços externos."""
+    SQLALCHEMY_DATABASE_URI = os.environ.get('BENCHMARK_DATABASE_URL') or 'sqlite:////tmp/deep_benchmark.db'
+    LOCAL_STORAGE_PATH = os.environ.get('BENCHMARK_STORAGE_PATH') or '/tmp/deep_benchmark'
+    STATUS_REDIS_URL = None
+    WORKER_METRICS_PORT = 0
+    METRICS_PUSHGATEWAY_URL = None
+    MODEL_PRELOAD = False
+    # Cada repetição reprocessa o mesmo arquivo: o cache de resultados mascararia o custo real
+    RESULT_CACHE_ENABLED = False
+
 config_by_name = dict(
     development=DevelopmentConfig,
     production=ProductionConfig,
-    testing=TestingConfig
+    testing=TestingConfig,
+    benchmark=BenchmarkConfig
 )
\ No newline at end of file
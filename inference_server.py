@@ -0,0 +1,28 @@
+# inference_server.py
+
+import os
+from app import create_app
+from app.tasks.inference_server import InferenceServer, bucket_sizes
+from app.tasks.process_video_task import load_model, warm_up_model
+
+# Seleciona a configuração baseada em uma variável de ambiente
+config_name = os.getenv('FLASK_CONFIG', 'development')
+app = create_app(config_name)
+
+if __name__ == '__main__':
+    socket_path = app.config.get('INFERENCE_SERVER_SOCKET')
+    if not socket_path:
+        raise SystemExit("Defina INFERENCE_SERVER_SOCKET para iniciar o servidor de inferência.")
+
+    max_batch = app.config['INFERENCE_SERVER_MAX_BATCH']
+    with app.app_context():
+        model = load_model(local_only=True)
+        if not model:
+            raise SystemExit("Não foi possível carregar o modelo de IA.")
+        # Um lote fictício por tamanho de lote do servidor (o Keras traça o grafo de cada shape)
+        for size in bucket_sizes(max_batch):
+            warm_up_model(model, size)
+
+    server = InferenceServer(socket_path, model, max_batch, app.config['INFERENCE_SERVER_MAX_WAIT_MS'])
+    print(f"Servidor de inferência ouvindo em {socket_path} (lote máx. {max_batch}).")
+    server.serve_forever()
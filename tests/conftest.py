@@ -0,0 +1,27 @@
+# tests/conftest.py
+
+import pytest
+from app import create_app
+from app.extensions import db
+from app.models import User
+
+TEST_USER_ID = 'test-user'
+
+class NullSocketIO:
+    """Descarta os eventos de progresso emitidos pelas tarefas."""
+
+    def emit(self, *args, **kwargs):
+        pass
+
+@pytest.fixture
+def app():
+    """Aplicação 'testing' (SQLite em memória, armazenamento local, sem Redis) com um usuário."""
+    app = create_app('testing')
+    app.config['STATUS_REDIS_URL'] = None
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=TEST_USER_ID, username='test', email='test@example.com', password_hash='-'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,52 @@
+# tests/test_face_detection.py
+
+import cv2
+import numpy as np
+from app.tasks.face_detection import FaceLocator
+
+FACE_BOX = (100, 60, 80, 80)
+
+class FixedDetector:
+    """Detector falso: sempre o mesmo rosto, contando as chamadas."""
+
+    def __init__(self, box=FACE_BOX):
+        self.box = box
+        self.calls = 0
+
+    def detect(self, small_bgr, small_gray):
+        self.calls += 1
+        return [self.box]
+
+def random_frame(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (180, 320, 3), dtype=np.uint8)
+
+def locate_all(locator, frames):
+    return [locator.locate(frame, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), i) for i, frame in enumerate(frames)]
+
+def test_detects_once_per_cycle_when_the_face_is_stable():
+    detector = FixedDetector()
+    locator = FaceLocator(detector, detection_interval=10)
+    boxes = locate_all(locator, [random_frame()] * 30)
+    assert detector.calls == 3
+    assert all(box is not None for box in boxes)
+
+def test_lost_face_forces_a_new_detection():
+    detector = FixedDetector()
+    locator = FaceLocator(detector, detection_interval=10)
+    frames = [random_frame()] * 10
+    frames[5] = np.zeros_like(frames[0])
+    locate_all(locator, frames)
+    # Ciclo inicial, o frame diferente e a volta ao conteúdo original
+    assert detector.calls == 3
+
+def test_cycles_follow_the_sampling_grid():
+    frames = [random_frame(seed) for seed in range(40)]
+    serial = locate_all(FaceLocator(FixedDetector(), detection_interval=10), frames)
+
+    segment_locator = FaceLocator(FixedDetector(), detection_interval=10)
+    gray = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    segment = [segment_locator.locate(frames[i], gray[i], i) for i in range(20, 40)]
+    assert segment == serial[20:]
+
+def test_from_config_is_disabled_by_default():
+    assert FaceLocator.from_config({}) is None
@@ -0,0 +1,11 @@
+# tests/test_import_budget.py
+
+from benchmarks.import_budget import MAX_BOOT_SECONDS, forbidden_modules, measure_boot
+
+def test_api_boot_does_not_import_worker_modules():
+    boot, _ = measure_boot('testing')
+    assert forbidden_modules(boot) == []
+
+def test_api_boot_within_time_budget():
+    boot, _ = measure_boot('testing')
+    assert boot['seconds'] <= MAX_BOOT_SECONDS
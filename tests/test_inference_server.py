@@ -0,0 +1,90 @@
+# tests/test_inference_server.py
+
+import os
+import threading
+import numpy as np
+import pytest
+from app.tasks.inference_server import (
+    DynamicBatcher,
+    InferenceClient,
+    InferenceServer,
+    bucket_sizes,
+)
+
+class RecordingBackend:
+    """Backend falso: devolve o primeiro pixel de cada frame e guarda o tamanho dos lotes."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_batch(self, batch):
+        self.batch_sizes.append(len(batch))
+        return np.repeat(batch.reshape(len(batch), -1)[:, :1], 7, axis=1)
+
+def frames(value, count):
+    return np.full((count, 48, 48, 1), value, dtype=np.float32)
+
+def test_bucket_sizes():
+    assert bucket_sizes(128) == [8, 16, 32, 64, 128]
+    assert bucket_sizes(100) == [8, 16, 32, 64, 100]
+
+def test_batches_are_padded_to_the_smallest_bucket():
+    backend = RecordingBackend()
+    batcher = DynamicBatcher(backend, max_batch=128, max_wait_ms=1)
+    batcher.start()
+    result = batcher.submit(frames(0.5, 5))
+    assert backend.batch_sizes == [8]
+    assert result.shape == (5, 7) and np.allclose(result, 0.5)
+
+def test_concurrent_requests_share_a_batch():
+    backend = RecordingBackend()
+    batcher = DynamicBatcher(backend, max_batch=128, max_wait_ms=200)
+    batcher.start()
+    results = {}
+
+    def submit(value, count):
+        results[value] = batcher.submit(frames(value, count))
+
+    threads = [threading.Thread(target=submit, args=(value, count)) for value, count in ((1.0, 32), (2.0, 32), (3.0, 20))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(backend.batch_sizes) <= 128
+    for value, count in ((1.0, 32), (2.0, 32), (3.0, 20)):
+        assert results[value].shape == (count, 7) and np.allclose(results[value], value)
+
+def test_client_round_trip_and_reconnect_after_fork(tmp_path):
+    socket_path = str(tmp_path / 'inference.sock')
+    server = InferenceServer(socket_path, RecordingBackend(), max_batch=32, max_wait_ms=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = InferenceClient(socket_path, timeout=5).connect()
+        assert np.allclose(client.predict_batch(frames(0.25, 3)), 0.25)
+
+        # Simula o filho de um fork: a conexão herdada não pode ser reutilizada
+        client.pid = -1
+        inherited = client.sock
+        assert np.allclose(client.predict_batch(frames(0.75, 2)), 0.75)
+        assert client.sock is not inherited and client.pid == os.getpid()
+        assert inherited.fileno() == -1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_server_reports_backend_errors(tmp_path):
+    class FailingBackend:
+        def predict_batch(self, batch):
+            raise RuntimeError("falha")
+
+    socket_path = str(tmp_path / 'inference.sock')
+    server = InferenceServer(socket_path, FailingBackend(), max_batch=8, max_wait_ms=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = InferenceClient(socket_path, timeout=5).connect()
+        with pytest.raises(RuntimeError):
+            client.predict_batch(frames(0.5, 1))
+    finally:
+        server.shutdown()
+        server.server_close()
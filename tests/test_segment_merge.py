@@ -0,0 +1,46 @@
+# tests/test_segment_merge.py
+
+import pytest
+from app import services
+from app.models import Frame, VideoStatus
+from app.tasks import segment_tasks
+from .conftest import TEST_USER_ID, NullSocketIO
+
+def frame(number):
+    return {'frame_number': number, 'timestamp': number / 24, 'emotions': {'happy': 1.0}, 'carried_forward': False}
+
+def segment(numbers):
+    return {'frames': [frame(number) for number in numbers], 'sampled_frames': len(numbers)}
+
+@pytest.fixture
+def video(app, monkeypatch):
+    monkeypatch.setattr(segment_tasks, 'socketio_celery', NullSocketIO())
+    return services.create_video_record(TEST_USER_ID, 'video', 'uploads/test-user/video.mp4')
+
+def test_segments_are_saved_in_chunks(app, video, monkeypatch):
+    app.config['CHUNK_SIZE'] = 4
+    calls = []
+    append = services.append_frame_results
+
+    def recording_append(*args):
+        calls.append(args)
+        return append(*args)
+
+    monkeypatch.setattr(services, 'append_frame_results', recording_append)
+
+    segment_tasks.merge_video_segments([segment(range(0, 10)), segment(range(10, 16))], video.id, 16 / 24)
+
+    assert [len(chunk) for _, chunk, _ in calls] == [4, 4, 2, 4, 2]
+    assert [sampled for _, _, sampled in calls] == [4, 8, 10, 14, 16]
+    saved = services.get_video_by_id(video.id)
+    assert saved.status == VideoStatus.COMPLETED
+    assert saved.frame_count == 16 and saved.checkpoint_frame == 15
+    assert Frame.query.filter_by(video_id=video.id).count() == 16
+
+def test_rerun_does_not_duplicate_saved_frames(app, video):
+    app.config['CHUNK_SIZE'] = 4
+    services.append_frame_results(video.id, [frame(number) for number in range(0, 8)], 8)
+
+    segment_tasks.merge_video_segments([segment(range(0, 10)), segment(range(10, 16))], video.id, 16 / 24)
+
+    assert Frame.query.filter_by(video_id=video.id).count() == 16
@@ -0,0 +1,25 @@
+# tests/test_segment_plan.py
+
+from app.tasks.segment_tasks import plan_segments
+
+FANOUT = {'FANOUT_ENABLED': True, 'FANOUT_SEGMENT_SECONDS': 10, 'FANOUT_MAX_SEGMENTS': 8}
+
+def test_disabled_by_default():
+    assert plan_segments({}, duration=120, target_fps=24, sampling_mode='uniform') is None
+
+def test_short_video_is_not_split():
+    assert plan_segments(FANOUT, duration=5, target_fps=24, sampling_mode='uniform') is None
+
+def test_segments_cover_the_sampling_grid():
+    segments = plan_segments(FANOUT, duration=60, target_fps=24, sampling_mode='uniform')
+    assert segments[0][0] == 0 and segments[-1][1] is None
+    assert all(end == next_start for (_, end), (next_start, _) in zip(segments, segments[1:]))
+
+def test_segments_start_on_detection_cycles():
+    config = dict(FANOUT, FACE_DETECTION_ENABLED=True, FACE_DETECTION_INTERVAL=7)
+    segments = plan_segments(config, duration=60, target_fps=24, sampling_mode='uniform')
+    assert all(start % 7 == 0 for start, _ in segments)
+
+def test_adaptive_and_dedup_are_not_split():
+    assert plan_segments(FANOUT, duration=60, target_fps=24, sampling_mode='adaptive') is None
+    assert plan_segments(dict(FANOUT, DEDUP_THRESHOLD=2.0), duration=60, target_fps=24, sampling_mode='uniform') is None
@@ -0,0 +1,22 @@
+# tests/test_streaming_ingest.py
+
+import struct
+from app.tasks.streaming_ingest import find_moov_placement
+
+def box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+def placement(data):
+    return find_moov_placement(lambda start, end: data[start:end], len(data))
+
+def test_moov_before_mdat():
+    assert placement(box(b'ftyp', b'isom') + box(b'moov', b'x' * 16) + box(b'mdat', b'y' * 64)) == 'start'
+
+def test_mdat_before_moov():
+    assert placement(box(b'ftyp', b'isom') + box(b'mdat', b'y' * 64) + box(b'moov', b'x' * 16)) == 'end'
+
+def test_fragmented_mp4_streams():
+    assert placement(box(b'ftyp', b'isom') + box(b'moof', b'x' * 16) + box(b'mdat', b'y' * 64)) == 'start'
+
+def test_not_an_mp4():
+    assert placement(b'\x1a\x45\xdf\xa3' + b'\x00' * 60) is None
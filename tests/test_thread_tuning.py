@@ -0,0 +1,15 @@
+# tests/test_thread_tuning.py
+
+from app.tasks.thread_tuning import derive_thread_settings
+
+def test_cpus_are_split_between_processes():
+    settings = derive_thread_settings({}, concurrency=4, cpus=8)
+    assert settings == {'intra_op': 2, 'inter_op': 2, 'opencv': 2}
+
+def test_at_least_one_thread_per_process():
+    settings = derive_thread_settings({}, concurrency=16, cpus=4)
+    assert settings['intra_op'] == 1 and settings['opencv'] == 1
+
+def test_config_overrides_derived_values():
+    config = {'TF_INTRA_OP_THREADS': 3, 'TF_INTER_OP_THREADS': 1, 'OPENCV_THREADS': 5}
+    assert derive_thread_settings(config, concurrency=2, cpus=8) == {'intra_op': 3, 'inter_op': 1, 'opencv': 5}
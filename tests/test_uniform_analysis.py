@@ -0,0 +1,38 @@
+# tests/test_uniform_analysis.py
+
+import numpy as np
+from app.tasks.process_video_task import run_uniform_analysis
+
+class ListProducer:
+    """Produtor falso: entrega lotes prontos (buffer, informações dos frames)."""
+
+    def __init__(self, batches):
+        self._batches = batches
+
+    def batches(self):
+        return iter(self._batches)
+
+class FailingFirstBatchModel:
+    """Modelo falso cujo primeiro lote falha."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_batch(self, batch):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("falha")
+        return np.full((len(batch), 7), 1 / 7, dtype=np.float32)
+
+def batch(first_frame, slots):
+    inferred = sum(slot is not None for slot in slots)
+    frames_info = [{'frame_number': first_frame + i, 'timestamp': (first_frame + i) / 24, 'slot': slot} for i, slot in enumerate(slots)]
+    return np.zeros((inferred, 48, 48, 1), dtype=np.uint8), frames_info
+
+def test_failed_batches_do_not_count_as_carried_forward():
+    producer = ListProducer([batch(0, [0, None, None]), batch(3, [0, None])])
+    results, sampled, carried_forward = run_uniform_analysis(producer, FailingFirstBatchModel(), 4, on_progress=lambda sampled: None)
+
+    assert sampled == 5
+    assert [result['frame_number'] for result in results] == [3, 4]
+    assert carried_forward == 1
@@ -0,0 +1,38 @@
+# tests/test_video_schema.py
+
+from app import services
+from app.schemas import VideoDetailSchema, VideoSchema
+from .conftest import TEST_USER_ID
+
+def create_video():
+    return services.create_video_record(TEST_USER_ID, 'video', 'uploads/test-user/video.mp4')
+
+def save_frames(video_id, numbers):
+    frames = [{'frame_number': n, 'timestamp': n / 24, 'emotions': {'happy': 1.0}} for n in numbers]
+    services.append_frame_results(video_id, frames, len(frames))
+
+def test_internal_columns_are_not_dumped(app):
+    video = create_video()
+    services.set_video_content_hash(video.id, 'a' * 64)
+    services.set_video_profile_key(video.id, 'uploads/test-user/video.profile.zip')
+
+    dumped = VideoSchema().dump(services.get_video_by_id(video.id))
+    assert not {'checkpoint_frame', 'content_hash', 'profile_key'} & set(dumped)
+
+def test_detail_with_partial_frames(app):
+    video = create_video()
+    save_frames(video.id, [0, 1, 2])
+
+    dumped = VideoDetailSchema(services.get_video_frames(video.id, since_frame=0), since_frame=0).dump(video)
+    assert [frame['frame_number'] for frame in dumped['frames']] == [1, 2]
+    assert dumped['frames'][0]['confidences'][3] == 1.0
+    assert dumped['frames_high_water_mark'] == 2
+    assert dumped['partial'] is True
+    assert 'checkpoint_frame' not in dumped
+
+def test_detail_without_new_frames_keeps_the_high_water_mark(app):
+    video = create_video()
+    save_frames(video.id, [0, 1])
+
+    dumped = VideoDetailSchema(services.get_video_frames(video.id, since_frame=1), since_frame=1).dump(video)
+    assert dumped['frames'] == [] and dumped['frames_high_water_mark'] == 1